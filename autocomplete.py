@@ -1,27 +1,99 @@
+#####################
+###### Imports ######
+#####################
+from array import array
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import gc
+import heapq
+from math import inf
+import mmap
+import struct
+import threading
+
 class Node:
     '''
     A basic class representing Nodes
 
     Author: Ooi Yu Zhang
     '''
-    def __init__(self, count=None, size=27) -> None:
+    __slots__ = ("count", "char", "next", "links")
+
+    def __init__(self, count=None, char=None) -> None:
         '''
         Constructor for Node class
 
         Input:
             count: an integer representing the word with the highest frequency that involves the letter stored in this node, else None
-            size: an integer representing lowercase alphabets and a terminal, which by default is 27
+            char: a string representing the letter stored in this node, "" for a terminal, else None for the root
         '''
         # Highest frequency of word involving letter in this node
         self.count = count
-        # Letter represented by this node
-        self.char = None
+        # Letter represented by this node, "" for a terminal so that it comes before every letter
+        self.char = char
         # Next node for word with highest frequency or in lexicographic order otherwise
         self.next = None
-        # Index of current letter represented with numbers from 1 to 26
-        self.index = inf
-        # List of links from this node to every alphabetical letter and the terminal
-        self.links = [None] * size
+        # Dictionary of links from this node to the letters that follow it and the terminal (under ""), only for those that exist
+        self.links = {}
+
+    def copy(self):
+        '''
+        Returns a copy of this node sharing its links, so that the copy can be updated without changing this node
+        '''
+        res = Node(count=self.count, char=self.char)
+        res.next = self.next
+        res.links = dict(self.links)
+        return res
+
+    def update_next(self) -> None:
+        '''
+        Recomputes the highest frequency and next Node of this node from its links, preferring the terminal and then the smaller letter on ties
+        '''
+        self.count = 0
+        self.next = None
+        for link in self.links.values():
+            if link.count > self.count or (link.count == self.count and self.next and link.char < self.next.char):
+                self.count = link.count
+                self.next = link
+
+def count_sentences(corpus):
+    '''
+    Function description:
+        This function aggregates a corpus into the frequency of every distinct sentence.
+
+    Input:
+        corpus: a list of strings, a list of tuples in the form of (sentence, frequency), or a dictionary from sentence to frequency
+
+    Output:
+        counts: a Counter from every distinct sentence to its total frequency
+
+    Time complexity: O(NM) where N is the number of items in corpus and M is the number of characters in the longest sentence
+    Aux space complexity: O(UM) where U is the number of distinct sentences and M is the number of characters in the longest sentence
+    '''
+    if isinstance(corpus, dict):
+        return Counter(corpus)
+    counts = Counter()
+    for item in corpus:
+        if isinstance(item, str):
+            counts[item] += 1
+        else:
+            sentence, frequency = item
+            counts[sentence] += frequency
+    return counts
+
+def without_gc(function, *args):
+    '''
+    Returns the result of calling function with the cyclic garbage collector paused. A trie being built allocates millions of Nodes that
+    all stay alive, so every collection triggered during the build scans all of them for nothing
+    '''
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return function(*args)
+    finally:
+        if enabled:
+            gc.enable()
 
 class CatsTrie:
     '''
@@ -29,160 +101,393 @@ class CatsTrie:
 
     Author: Ooi Yu Zhang
     '''
-    def __init__(self, sentences) -> None:
+    def __init__(self, sentences, cache_size=0) -> None:
         '''
         Function description:
             This function is a constructor for the CatsTrie class which initialises the Trie.
 
         Approach description:
-            The main approach for initialising the CatsTrie is by recursively inserting each word from sentences into the CatsTrie
+            The main approach for initialising the CatsTrie is by inserting each word from sentences into the CatsTrie
             by initialising each letter of the sentence as a Node and storing the details of the letter and the sentence for autocomplete
-            inside the Node both during initialisation and during recursion. The details for both are discussed in the functions
-            insert and insert_aux below.
+            inside the Node both on the way down and on the way back up the sentence. The details for both are discussed in the function
+            insert below.
 
         Author: Ooi Yu Zhang
 
         Input:
             sentences: a list of strings
+            cache_size: an integer representing the number of prompts whose autocompleted sentence is cached by autoComplete, 0 for no cache
 
         Time complexity: O(NM) where N is the number of sentences in the list sentences and M is the number of characters in the longest sentence
         Aux space complexity: O(NM) where N is the number of sentences in the list sentences and M is the number of characters in the longest sentence
         '''
         # Initialising the root node
         self.root = Node(count=0)
-        # Level of root node is 0
-        self.level = 0
-        # Minimum level (in the case where frequency is the same, so we look at lexicographic order)
-        self.minlevel = inf
+        # Least recently used cache from prompt to autocompleted sentence, most recently used last
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        # Length of the longest prompt ever cached, longer prefixes never need to be evicted
+        self.cache_longest = -1
+        # Factor of decay applied to every frequency, frequencies are stored divided by it
+        self.scale = 1
         # Iterating through every word in the list, sentences
         for key in sentences:
             self.insert(key)
 
-    def insert(self, key) -> None:
+    @classmethod
+    def from_corpus(cls, corpus, cache_size=0):
         '''
         Function description:
-            This function inserts a sentence from the list, sentences into the CatsTrie
+            This function builds a CatsTrie in bulk from a corpus of sentences or sentence frequencies.
 
         Approach description:
-            As this function is executed in a loop, the main approach is to always start from the root node, then recursively insert
-            the sentence into the CatsTrie, character by character using the function insert_aux which is discussed below. After insertion,
-            the details for the sentence to be used for autocomplete during an empty string is updated accordingly.
+            Inserting one sentence at a time walks the whole sentence and updates the autocomplete of every Node on its path once per
+            occurrence. Instead, the frequency of every distinct sentence is aggregated first, and the distinct sentences are inserted in
+            sorted order, keeping a stack of the Nodes of the previous sentence. Only the Nodes past the longest common prefix with the previous
+            sentence are new, and every Node popped off the stack will never be visited again, as all later sentences are lexicographically
+            larger. Hence the autocomplete of a Node is computed exactly once, when it is popped, from the links below it which are all final.
 
         Author: Ooi Yu Zhang
 
         Input:
-            key: a string representing the current sentence to be inserted
+            corpus: a list of strings, a list of tuples in the form of (sentence, frequency), or a dictionary from sentence to frequency
+            cache_size: an integer representing the number of prompts whose autocompleted sentence is cached by autoComplete, 0 for no cache
 
-        Time complexity: O(M) where M is the number of characters in the longest sentence
-        Aux space complexity: O(M) where M is the number of characters in the longest sentence
+        Output:
+            trie: a CatsTrie containing every sentence of corpus with its total frequency
+
+        Time complexity: O(N + UM log U) where N is the number of items in corpus, U is the number of distinct sentences and M is the number
+                         of characters in the longest sentence
+        Aux space complexity: O(UM) where U is the number of distinct sentences and M is the number of characters in the longest sentence
         '''
-        # Start from root node for every sentence
-        current = self.root
-        # Recursively insert sentence into CatsTrie
-        res = self.insert_aux(current, key)
-        # Update details at root node
-        # If frequency of the newly inserted / existing sentence is greater than the current highest
-        if res.count > current.count:
-            # Update highest frequency
-            current.count = res.count
-            # Update autocomplete for empty string
-            current.next = res
-            # Update level for autocomplete
-            self.minlevel = self.level
-        # If same frequency but sentence is lexicographically smaller
-        elif res.count == current.count and self.level < self.minlevel:
-            # Update highest frequency
-            current.count = res.count
-            # Update autocomplete for empty string
-            current.next = res
-            # Update level for autocomplete
-            self.minlevel = self.level
-
-        # Reset counter for level
-        self.level = 0
-
-    def insert_aux(self, current, key):
+        trie = cls([], cache_size)
+        counts = count_sentences(corpus)
+
+        # Stack of Nodes from the root to the last letter of the previous sentence
+        stack = [trie.root]
+        previous = ""
+        for key in sorted(counts):
+            if counts[key] <= 0:
+                continue
+            # Length of the longest common prefix with the previous sentence
+            common = 0
+            while common < min(len(key), len(previous)) and key[common] == previous[common]:
+                common += 1
+            # Nodes past the common prefix are final, compute their autocomplete
+            while len(stack) > common + 1:
+                stack.pop().update_next()
+
+            current = stack[-1]
+            for i in range(common, len(key)):
+                # Initialise new Node for letter and move to it
+                current.links[key[i]] = Node(count=0, char=key[i])
+                current = current.links[key[i]]
+                stack.append(current)
+
+            # Initialise terminal for new sentence with its total frequency
+            current.links[""] = Node(count=counts[key], char="")
+            previous = key
+
+        # Compute autocomplete for the Nodes of the last sentence, up to the root
+        while stack:
+            stack.pop().update_next()
+        return trie
+
+    @classmethod
+    def from_shards(cls, corpus, workers=None, prefix_length=1, cache_size=0):
         '''
         Function description:
-            This function inserts each letter from the sentence to be inserted into the Trie recursively.
+            This function builds a CatsTrie in bulk like from_corpus, building parts of it in parallel in a pool of worker processes.
 
         Approach description:
-            The main approach used in the implementation of this function is use of recursion where various information is
-            passed into the current Node during initial insertion and during return of recursion. Firstly, a base case is
-            established so the recursive calls will return when the function reaches the end of the sentence. Otherwise,
-            if the base case is not reached, the function will try to move to the next letter in the sentence, if the letter
-            doesn't exist, the function will initialise the letter as a new Node while updating all the related details.
-            Once that is done, the recursive call is executed. On return of the recursive call, as we have already reached the
-            end of the sentence, we know whether the newly added or existing sentence has a higher frequency than the current highest,
-            hence we can check and update the autocomplete for every Node containing the letter in the sentence.
+            Sentences with different first letters never share a Node below the root, so the distinct sentences are split into shards by
+            their first prefix_length letters, and every shard is built into a CatsTrie of its own with from_corpus in a worker process. The
+            tries of the shards are sent back flattened (see __getstate__) and grafted under one root: where a link of a shard doesn't
+            exist yet, the whole link is moved over, and only the Nodes of the shared prefixes, at most prefix_length deep, are merged. The
+            autocomplete of the merged Nodes, including the root, is then computed again from their links, which compares the winners of the
+            shards below them. Without workers, the shards would only be built one after another, so from_corpus builds the whole trie instead.
 
         Author: Ooi Yu Zhang
 
         Input:
-            current: a Node representing the current character of the sentence to be inserted
-            key: a string representing the current sentence to be inserted
+            corpus: a list of strings, a list of tuples in the form of (sentence, frequency), or a dictionary from sentence to frequency
+            workers: an integer representing the number of worker processes to build the shards with, else None to build with from_corpus in this process
+            prefix_length: an integer representing the number of first letters that sentences are split into shards by
+            cache_size: an integer representing the number of prompts whose autocompleted sentence is cached by autoComplete, 0 for no cache
 
         Output:
-            current: a Node representing the current character of the sentence to be inserted
+            trie: a CatsTrie containing every sentence of corpus with its total frequency
+
+        Time complexity: O(N + UM log U) where N is the number of items in corpus, U is the number of distinct sentences and M is the number
+                         of characters in the longest sentence, divided by up to the number of workers
+        Aux space complexity: O(UM) where U is the number of distinct sentences and M is the number of characters in the longest sentence
+        '''
+        counts = count_sentences(corpus)
+        if not workers:
+            return cls.from_corpus(counts, cache_size)
+
+        # Split the distinct sentences into shards by their first letters
+        shards = {}
+        for key, frequency in counts.items():
+            shards.setdefault(key[:prefix_length], {})[key] = frequency
+
+        trie = cls([], cache_size)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # The worker processes only build shards, so the garbage collector can be paused in them without affecting this process
+            for shard in executor.map(without_gc, [cls.from_corpus] * len(shards), shards.values()):
+                trie.graft(shard.root)
+        return trie
+
+    def graft(self, other) -> None:
+        '''
+        Moves every sentence below the Node other into this CatsTrie, which must not contain any of them yet, merging only the Nodes of the
+        prefixes they share with sentences already in it
+        '''
+        stack = [(self.root, other)]
+        # Merged Nodes, every Node after its parent
+        merged = []
+        while stack:
+            current, other = stack.pop()
+            merged.append(current)
+            for char, link in other.links.items():
+                if char in current.links:
+                    stack.append((current.links[char], link))
+                else:
+                    current.links[char] = link
+        # Compute the autocomplete of the merged Nodes from the bottom up
+        for current in reversed(merged):
+            current.update_next()
+
+    def __getstate__(self):
+        '''
+        Returns the attributes of this CatsTrie for pickling, with the Nodes flattened into lists in preorder, so that pickling a CatsTrie
+        of long sentences doesn't run into the recursion limit
+        '''
+        state = dict(self.__dict__)
+        chars = []
+        counts = []
+        degrees = []
+        # Letter of the next Node of every Node, which is always one of its links
+        nexts = []
+        stack = [self.root]
+        while stack:
+            current = stack.pop()
+            chars.append(current.char)
+            counts.append(current.count)
+            degrees.append(len(current.links))
+            nexts.append(current.next.char if current.next else None)
+            stack.extend(current.links.values())
+        state["root"] = (chars, counts, degrees, nexts)
+        return state
+
+    def __setstate__(self, state) -> None:
+        '''
+        Restores the attributes of a CatsTrie from __getstate__, rebuilding its Nodes
+        '''
+        chars, counts, degrees, nexts = state["root"]
+        nodes = list(map(Node, counts, chars))
+        # Stack of Nodes still missing links, with the number of links missing
+        stack = []
+        for current, degree in zip(nodes, degrees):
+            if stack:
+                parent = stack[-1]
+                parent[0].links[current.char] = current
+                parent[1] -= 1
+                if not parent[1]:
+                    stack.pop()
+            if degree:
+                stack.append([current, degree])
+        for current, char in zip(nodes, nexts):
+            if char is not None:
+                current.next = current.links[char]
+        self.__dict__.update(state)
+        self.root = nodes[0]
+
+    def insert(self, key) -> None:
+        '''
+        Function description:
+            This function inserts a sentence from the list, sentences into the CatsTrie, which is the same as incrementing its frequency by 1
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            key: a string representing the current sentence to be inserted
 
         Time complexity: O(M) where M is the number of characters in the longest sentence
         Aux space complexity: O(M) where M is the number of characters in the longest sentence
         '''
-        # Base case, when at the end of current sentence
-        if len(key) == 0:
-            # If sentence already initialised previously (has a terminal)
-            if current.links[0]:
-                # Increment frequency
-                current.links[0].count += 1
-            # Sentence hasn't been previously initialised
-            else:
-                # Initialise terminal for new sentence
-                current.links[0] = Node(count=1)
-            # Return terminal
-            return current.links[0]
+        self.increment(key, 1)
+
+    def increment(self, key, delta=1) -> None:
+        '''
+        Function description:
+            This function adds delta to the frequency of a sentence, inserting it if it doesn't exist yet and removing it if its frequency
+            drops to 0 or below
+
+        Approach description:
+            The main approach is to always start from the root node and walk down the sentence by index, one character at a time,
+            initialising a new Node for every letter that doesn't exist yet, while pushing every Node visited onto an explicit stack.
+            Once the end of the sentence is reached, its terminal is initialised or its frequency is updated. Then, the Nodes are
+            popped off the stack from the bottom up, and as we now know whether the newly added or existing sentence has a higher frequency
+            than the current highest, we can check and update the autocomplete for every Node containing the letter in the sentence,
+            including the root node which is used for autocomplete during an empty string. Unlike recursion, this never copies the rest
+            of the sentence and isn't limited by the recursion limit, so very long sentences can be inserted.
+            When the frequency goes down instead, another link of a Node on the path may now have the highest frequency, so the links of
+            every Node on the path are scanned again, and the terminal and the Nodes left without links are removed on the way up.
+            The autocompleted sentence of a Node on the path can only change by becoming or stopping being the updated sentence, which
+            happens exactly when whether its next Node is the next Node on the path and that Node's autocompleted sentence is the updated
+            sentence changes. Only the prefixes of the sentence at such Nodes are evicted from the cache of autoComplete.
+            Frequencies are stored divided by the scale of decay, so delta is divided by it too.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            key: a string representing the sentence to be updated
+            delta: a number representing the change in the frequency of the sentence, -inf to remove it
+
+        Time complexity: O(M) where M is the number of characters in the longest sentence, O(MS) when delta is negative where S is the
+                         largest number of links of a Node
+        Aux space complexity: O(M) where M is the number of characters in the longest sentence
+        '''
+        if not delta:
+            return
+        # Keep whole frequencies as integers until the first decay
+        if self.scale != 1:
+            delta = delta / self.scale
+
+        # Stack of Nodes visited from the root to the last letter of the sentence, a sentence that doesn't exist can't be decremented
+        stack = self.path(key, delta > 0)
+        if not stack:
+            return
+        root = stack[0]
+        current = stack[-1]
+
+        # If sentence already initialised previously (has a terminal)
+        if "" in current.links:
+            # Update frequency
+            current.links[""].count += delta
+            was_best = True
+        # Sentence hasn't been previously initialised
+        elif delta > 0:
+            # Initialise terminal for new sentence
+            current.links[""] = Node(count=delta, char="")
+            was_best = False
         else:
-            # Compute index for current letter using math (ASCII code - 97 + 1)
-            index = ord(key[0]) - 97 + 1
-            # If path exists
-            if current.links[index]:
-                # Move to next node
-                current = current.links[index]
-                # Increment counter for level
-                self.level += 1
-            # If path doesn't exist
+            return
+        res = current.links[""]
+        # Whether the autocompleted sentence of res is the updated sentence, before and after the update
+        is_best = res.count > 0
+
+        # Update details for autocomplete word at every Node from the bottom up
+        while stack:
+            current = stack.pop()
+            was_best = was_best and current.next is res
+            if delta > 0:
+                # If current sentence has higher frequency than current highest
+                if res.count > current.count:
+                    # Update highest frequency
+                    current.count = res.count
+                    # Update path
+                    current.next = res
+                # If current sentence has same frequency but lexicographically smaller (the terminal comes before every letter)
+                elif res.count == current.count and res.char < current.next.char:
+                    # Update path
+                    current.next = res
             else:
+                # Remove the terminal of a sentence without frequency, and letters without sentences below them
+                if res.count <= 0 if res.char == "" else not res.links:
+                    del current.links[res.char]
+                current.update_next()
+            is_best = is_best and current.next is res
+            # Evict the prefix ending at this Node if its autocompleted sentence changed
+            if is_best != was_best and len(stack) <= self.cache_longest:
+                self.cache.pop(key[:len(stack)], None)
+            res = current
+        self.root = root
+
+    def path(self, key, create):
+        '''
+        Returns the stack of Nodes from the root to the last letter of key, initialising the letters that don't exist yet if create,
+        else None if they don't exist
+        '''
+        # Start from root node for every sentence
+        current = self.root
+        stack = [current]
+        for i in range(len(key)):
+            # If path doesn't exist
+            if key[i] not in current.links:
+                if not create:
+                    return None
                 # Initialise new Node for letter
-                current.links[index] = Node(count=0)
-                # Initialise letter for Node
-                current.links[index].char = key[0]
-                # Move to next node
-                current = current.links[index]
-                # Initialise index of letter for Node
-                current.index = index
-                # Increment counter for level
-                self.level += 1
-
-            # Recursive call for insertion
-            res = self.insert_aux(current, key[1:])
-
-            # Update details for autocomplete word at current Node
-            # If current sentence has higher frequency than current highest
-            if res.count > current.count:
-                # Update highest frequency
-                current.count = res.count
-                # Update path
-                current.next = res
-            # If current sentence has same frequency but lexicographically smaller
-            elif res.index < current.next.index and res.count == current.count and current.next.index != inf:
-                # Update path
-                current.next = res
-            # If current sentence has same frequency and the sentence is the prefix
-            elif res.index == inf and res.count == current.count:
-                # Update path
-                current.next = res
-
-            # Update on return during recursion
-            return current
+                current.links[key[i]] = Node(count=0, char=key[i])
+            # Move to next node
+            current = current.links[key[i]]
+            stack.append(current)
+        return stack
+
+    def remove(self, key) -> None:
+        '''
+        Removes every occurrence of a sentence, if it exists, in O(MS) where M is the number of characters in the sentence and S is the
+        largest number of links of a Node
+        '''
+        self.increment(key, -inf)
+
+    def frequency(self, key):
+        '''
+        Returns the current frequency of a sentence, 0 if it doesn't exist
+        '''
+        current = self.find(key)
+        if not current or "" not in current.links:
+            return 0
+        return current.links[""].count * self.scale
+
+    def decay(self, factor) -> None:
+        '''
+        Function description:
+            This function multiplies the frequency of every sentence by factor, so that older occurrences count for less than newer ones
+
+        Approach description:
+            Multiplying every frequency by the same factor never changes which sentence has the highest frequency below a Node, nor the
+            ties between them, so no autocomplete and no cached prompt changes. Hence instead of visiting every Node, the frequencies are
+            stored divided by a scale which is multiplied by factor, and increment divides its delta by the scale. When the scale gets so small
+            or large that the stored frequencies could lose precision, it is folded back into the frequencies of every Node in one pass.
+            Rounding while folding can create ties and change autocompletes, so the cache is cleared then.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            factor: a positive number to multiply the frequency of every sentence by
+
+        Time complexity: O(1) amortised, O(T) when the scale is folded back where T is the number of Nodes
+        Aux space complexity: O(1) amortised, O(M) when the scale is folded back where M is the number of characters in the longest sentence
+        '''
+        if factor <= 0:
+            raise ValueError("Decay factor must be positive, got " + str(factor))
+        self.scale *= factor
+        if 2 ** -256 < self.scale < 2 ** 256:
+            return
+        self.rescale(self.root, self.scale)
+        self.scale = 1.0
+        self.cache.clear()
+
+    @staticmethod
+    def rescale(root, scale) -> None:
+        '''
+        Multiplies the frequency of every sentence below root by scale, computing the autocomplete of every Node again after its links
+        in case rounding created ties
+        '''
+        stack = [(root, False)]
+        while stack:
+            current, visited = stack.pop()
+            if visited:
+                current.update_next()
+            elif current.char == "":
+                current.count *= scale
+            else:
+                stack.append((current, True))
+                stack.extend((link, False) for link in current.links.values())
 
     def autoComplete(self, prompt):
         '''
@@ -200,7 +505,7 @@ class CatsTrie:
         Author: Ooi Yu Zhang
 
         Input:
-            prompt: a string with the characters in the set of [a...z] representing the incomplete sentence that is to be completed by the CatsTrie
+            prompt: a string representing the incomplete sentence that is to be completed by the CatsTrie
 
         Output:
             res: a string representing the autocompleted sentence from the given prompt, else None
@@ -210,45 +515,884 @@ class CatsTrie:
             O(X) if such a sentence does not exist where X is the length of the prompt
         Aux space complexity: O(1)
         '''
+        if self.cache_size:
+            # Return the cached autocompleted sentence if there is one
+            if prompt in self.cache:
+                self.cache_hits += 1
+                self.cache.move_to_end(prompt)
+                return self.cache[prompt]
+            self.cache_misses += 1
+
+        current = self.find(prompt)
+        # Prompt does not exist
+        res = self.complete(current, prompt) if current else None
+
+        if self.cache_size:
+            # Cache the autocompleted sentence, evicting the least recently used prompt if the cache is full
+            self.cache[prompt] = res
+            self.cache_longest = max(self.cache_longest, len(prompt))
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        return res
+
+    def cache_info(self):
+        '''
+        Returns the hits, misses, current size and maximum size of the cache of autoComplete as a dictionary
+        '''
+        return {"hits": self.cache_hits, "misses": self.cache_misses, "size": len(self.cache), "maxsize": self.cache_size}
+
+    def find(self, prompt):
+        '''
+        Returns the Node reached by walking down prompt from the root, else None
+        '''
         # Begin from root
         current = self.root
 
-        # Result (Autocomplete sentence)
-        res = ""
-        level = 0
-
         # Iterate through each character in prompt
         for char in prompt:
-            # Compute index for current letter using math (ASCII code - 97 + 1)
-            index = ord(char) - 97 + 1
-            # If path exists
-            if current.links[index]:
-                # Move to next character
-                current = current.links[index]
-                # Increment counter for current level
-                level += 1
-                # Update autocomplete sentence
-                res += current.char
+            # Move to next character
+            current = current.links.get(char)
             # If path does not exist
-            else:
+            if not current:
                 # Prompt does not exist
                 return None
+        return current
+
+    def complete(self, current, prompt):
+        '''
+        Returns the autocompleted sentence from the Node current reached by walking down prompt, else None
+        '''
+        # No sentences in the CatsTrie
+        if not current.next:
+            return None
+
+        # Result (Autocomplete sentence)
+        res = [prompt]
+        # Follow the next Nodes until the terminal of the sentence with the highest frequency (or lexicographically smallest)
+        while current.next.char:
+            # Move to next character in sentence
+            current = current.next
+            # Update autocomplete sentence
+            res.append(current.char)
+        return "".join(res)
+
+    def autoComplete_batch(self, prompts):
+        '''
+        Function description:
+            This function returns the autocompleted sentence of every prompt in prompts, the same as calling autoComplete on each of them
+
+        Approach description:
+            Bursts of prompts typically share long prefixes, like "c", "ca", "cat" and "cats". The prompts are sorted so that prompts sharing
+            a prefix are next to each other, and the Nodes reached by every character of the previous prompt are kept on a stack. For every
+            prompt, only the part past its longest common prefix with the previous prompt is walked, starting from the Node on the stack at
+            the end of that prefix, so every shared prefix is walked once.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            prompts: a list of strings representing incomplete sentences
+
+        Output:
+            res: a list of strings representing the autocompleted sentence of each prompt in the same order, None where there is none
+
+        Time complexity: O(PX log P + D) where P is the number of prompts, X is the length of the longest prompt and D is the number of
+                         distinct Nodes walked by all prompts or followed for autocomplete
+        Aux space complexity: O(P + D) where P is the number of prompts and D is the number of distinct Nodes walked or followed
+        '''
+        res = [None] * len(prompts)
+        # Nodes reached by every character of the previous prompt, starting from the root
+        stack = [self.root]
+        previous = ""
+        # Autocompleted sentence of every Node seen so far, shared by all Nodes along the same next Nodes
+        completed = {}
+        for i in sorted(range(len(prompts)), key=prompts.__getitem__):
+            prompt = prompts[i]
+            # Length of the longest common prefix with the previous prompt that exists in the CatsTrie
+            if len(previous) < len(stack) and prompt.startswith(previous):
+                common = len(previous)
+            else:
+                common = 0
+                while common < min(len(prompt), len(stack) - 1) and prompt[common] == previous[common]:
+                    common += 1
+            del stack[common + 1:]
 
-        # If prompt is the sentence
-        if not current.next and current.links[0]:
-            return prompt
-        elif current.next:
-            # Write a loop that returns lexicographically the highest frequency autocomplete word from sentences
-            while current.next.char:
-                # Break if same frequency, lexicographically smaller
-                if self.level == self.minlevel and current.links[0] and current.count == self.root.count:
+            # Walk the rest of the prompt
+            for j in range(common, len(prompt)):
+                current = stack[-1].links.get(prompt[j])
+                if not current:
                     break
-                # Move to next character in sentence
+                stack.append(current)
+            previous = prompt
+
+            # Prompt does not exist, or there are no sentences at all
+            if len(stack) != len(prompt) + 1 or not stack[-1].next:
+                continue
+            # Follow the next Nodes until the terminal, or a Node whose autocompleted sentence is known, which is the same sentence
+            current = stack[-1]
+            visited = [current]
+            chars = [prompt]
+            while id(current) not in completed and current.next.char:
                 current = current.next
-                # Update autocomplete sentence
-                res += current.char
-                # Increment counter for current level
-                level += 1
+                visited.append(current)
+                chars.append(current.char)
+            res[i] = completed[id(current)] if id(current) in completed else "".join(chars)
+            for current in visited:
+                completed[id(current)] = res[i]
+        return res
+
+    def cursor(self, prompt=""):
+        '''
+        Returns a CatsTrieCursor for a session typing into this CatsTrie, starting from prompt
+        '''
+        return CatsTrieCursor(self, prompt)
+
+    def autoComplete_topk(self, prompt, k):
+        '''
+        Function description:
+            This function returns the k most frequent sentences that begin with the prompt, ties broken lexicographically
+
+        Approach description:
+            The count stored in every Node is the highest frequency of any sentence below it, which is an upper bound on the frequency of
+            every sentence below it that is actually reached. Hence a best-first search is used: starting from the Node reached by the prompt,
+            a heap of Nodes is kept ordered by (highest frequency, letters so far), and the Node at the top of the heap is repeatedly replaced
+            by its links. When a terminal reaches the top of the heap, no Node left in the heap can lead to a more frequent sentence, or an
+            equally frequent but lexicographically smaller one, as the letters of a Node are a prefix of all sentences below it. So the
+            terminals come out of the heap in the required order, and the search stops after k of them without visiting the rest of the subtree.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            prompt: a string representing the incomplete sentence that is to be completed by the CatsTrie
+            k: an integer representing the number of sentences to return
+
+        Output:
+            res: a list of up to k strings representing the autocompleted sentences from the given prompt, from the most frequent
+
+        Time complexity: O(X + kYS(X+Y) log(kYS)) where X is the length of the prompt, Y is the length of the longest sentence returned and S
+                         is the largest number of links of a Node, as every Node popped pushes its links, each with a copy of its letters so far
+                         which are also compared to break ties in the heap
+        Aux space complexity: O(kYS(X+Y)) where X is the length of the prompt, Y is the length of the longest sentence returned and S is the
+                              largest number of links of a Node
+        '''
+        res = []
+        current = self.find(prompt)
+        if not current or k < 1:
             return res
+
+        # Heap of (-highest frequency, letters so far, insertion order, Node), the insertion order avoids comparing Nodes
+        heap = [(-current.count, prompt, 0, current)]
+        pushed = 1
+        while heap and len(res) < k:
+            count, sentence, order, current = heapq.heappop(heap)
+            # A terminal at the top of the heap is the next sentence
+            if current.char == "":
+                res.append(sentence)
+                continue
+            for link in current.links.values():
+                heapq.heappush(heap, (-link.count, sentence + link.char, pushed, link))
+                pushed += 1
+        return res
+
+    def autoComplete_fuzzy(self, prompt, distance=1):
+        '''
+        Function description:
+            This function returns the autocompleted sentence from a prompt that may have been mistyped, which is the most frequent sentence
+            beginning with any prefix within the given edit distance of the prompt
+
+        Approach description:
+            The edit distance between the prompt and the letters of a Node is computed like the Levenshtein distance, one row per Node: the
+            row of a Node holds the edit distance from every prefix of the prompt to its letters, and the row of a link is computed from
+            the row of the Node and the letter of the link alone. So the rows are computed while walking down the CatsTrie, and a Node matches
+            when the last entry of its row is within the distance, in which case its autocompleted sentence is the most frequent one
+            beginning with a matching prefix below it. When every entry of the row of a Node is over the distance, no link below it can
+            match, so the Node is pruned.
+            Like autoComplete_topk, the search is best-first on the highest frequency below every Node, so that the first Node matching
+            gives the highest frequency possible, and the search stops as soon as every Node left has a lower frequency. Among the sentences
+            with the same frequency, the one with the smallest edit distance is returned, then the lexicographically smallest.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            prompt: a string representing the possibly mistyped incomplete sentence that is to be completed by the CatsTrie
+            distance: an integer representing the highest number of letters inserted, deleted or substituted in the prompt
+
+        Output:
+            res: a string representing the autocompleted sentence from the given prompt, else None
+
+        Time complexity: O(VX log V + Y) where V is the number of Nodes visited, X is the length of the prompt and Y is the length of the
+                         sentence returned, V being at most the number of Nodes within the distance of a prefix of the prompt
+        Aux space complexity: O(VX) where V is the number of Nodes visited and X is the length of the prompt
+        '''
+        # Best match as (-frequency, edit distance, sentence)
+        best = None
+        # Heap of (-highest frequency, letters so far, insertion order, Node, row), the insertion order avoids comparing Nodes
+        heap = [(-self.root.count, "", 0, self.root, list(range(len(prompt) + 1)))]
+        pushed = 1
+        while heap:
+            count, letters, order, current, row = heapq.heappop(heap)
+            # No Node left can lead to a more frequent sentence
+            if best and count > best[0]:
+                break
+            # The edit distance never goes below the smallest entry of the row further down, so a Node that can only tie on frequency
+            # can only win with a smaller edit distance
+            if not current.next or best and count == best[0] and min(row) > best[1]:
+                continue
+            if row[-1] <= distance:
+                res = (count, row[-1], self.complete(current, letters))
+                if not best or res < best:
+                    best = res
+            for link in current.links.values():
+                if link.char == "":
+                    continue
+                # Row of the link from the row of the Node
+                new = [row[0] + 1]
+                for i in range(1, len(row)):
+                    new.append(min(row[i] + 1, new[i - 1] + 1, row[i - 1] + (prompt[i - 1] != link.char)))
+                if min(new) <= distance:
+                    heapq.heappush(heap, (-link.count, letters + link.char, pushed, link, new))
+                    pushed += 1
+        return best[2] if best else None
+
+class SnapshotCatsTrie(CatsTrie):
+    '''
+    A class representing a CatsTrie that can be read from many threads while sentences are being inserted, without readers ever waiting
+    for a lock
+
+    Author: Ooi Yu Zhang
+    '''
+    def __init__(self, sentences, cache_size=0) -> None:
+        '''
+        Function description:
+            This function is a constructor for the SnapshotCatsTrie class which initialises the Trie.
+
+        Approach description:
+            A reader of a CatsTrie only ever reads the root once and then follows links, so it sees a consistent trie as long as no Node it
+            can reach is changed while it reads. Hence the Nodes reachable from the root are never changed here: a writer copies every Node
+            on the path of its sentence, including the root and the terminal, updates the copies with the usual bottom-up pass, and then
+            publishes the new root with a single assignment, which is atomic. Readers that started before keep reading the old root, which
+            is left untouched, and the Nodes off the path are shared by both. Writers are serialised by a lock that readers never take.
+            The cache of autoComplete is updated by readers, so it isn't supported here.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            sentences: a list of strings
+            cache_size: must be 0, caching is not supported
+
+        Time complexity: O(NMS) where N is the number of sentences, M is the number of characters in the longest sentence and S is the
+                         largest number of links of a Node, as every insertion copies the links of every Node on its path
+        Aux space complexity: O(NM) where N is the number of sentences in the list sentences and M is the number of characters in the longest sentence
+        '''
+        if cache_size:
+            raise ValueError("SnapshotCatsTrie does not support caching")
+        # Serialises writers, readers never take it
+        self.lock = threading.Lock()
+        super().__init__([], 0)
+        # Root and scale of decay published together, for readers of frequencies
+        self.snapshot = (self.root, self.scale)
+        for key in sentences:
+            self.insert(key)
+
+    def increment(self, key, delta=1) -> None:
+        '''
+        Adds delta to the frequency of a sentence like CatsTrie.increment, publishing the update atomically
+        '''
+        with self.lock:
+            super().increment(key, delta)
+            self.snapshot = (self.root, self.scale)
+
+    def path(self, key, create):
+        '''
+        Returns the stack of copies of the Nodes from the root to the last letter of key, with a copy of the terminal of key if it exists,
+        initialising the letters that don't exist yet if create, else None if they don't exist
+        '''
+        current = self.root.copy()
+        stack = [current]
+        for i in range(len(key)):
+            if key[i] in current.links:
+                self.copy_link(current, key[i])
+            elif create:
+                current.links[key[i]] = Node(count=0, char=key[i])
+            else:
+                return None
+            current = current.links[key[i]]
+            stack.append(current)
+        # The terminal is updated in place by increment
+        if "" in current.links:
+            self.copy_link(current, "")
+        return stack
+
+    @staticmethod
+    def copy_link(current, char) -> None:
+        '''
+        Replaces the link of current to char with a copy, pointing the next Node of current to the copy if it pointed to the link
+        '''
+        link = current.links[char]
+        copy = link.copy()
+        if current.next is link:
+            current.next = copy
+        current.links[char] = copy
+
+    def decay(self, factor) -> None:
+        '''
+        Multiplies the frequency of every sentence by factor like CatsTrie.decay, copying the whole trie when the scale is folded back
+        '''
+        if factor <= 0:
+            raise ValueError("Decay factor must be positive, got " + str(factor))
+        with self.lock:
+            scale = self.scale * factor
+            root = self.root
+            if not 2 ** -256 < scale < 2 ** 256:
+                root = self.copy_all(root)
+                self.rescale(root, scale)
+                scale = 1.0
+            self.root, self.scale = root, scale
+            self.snapshot = (root, scale)
+
+    @staticmethod
+    def copy_all(root):
+        '''
+        Returns a copy of every Node below root, with the next Nodes pointing to the copies
+        '''
+        res = root.copy()
+        stack = [res]
+        while stack:
+            current = stack.pop()
+            for char in list(current.links):
+                SnapshotCatsTrie.copy_link(current, char)
+                stack.append(current.links[char])
+        return res
+
+    def __getstate__(self):
+        '''
+        Returns the attributes of this SnapshotCatsTrie for pickling like CatsTrie.__getstate__, without the lock and the snapshot
+        '''
+        with self.lock:
+            state = super().__getstate__()
+        del state["lock"], state["snapshot"]
+        return state
+
+    def __setstate__(self, state) -> None:
+        '''
+        Restores the attributes of a SnapshotCatsTrie from __getstate__ with a new lock
+        '''
+        super().__setstate__(state)
+        self.lock = threading.Lock()
+        self.snapshot = (self.root, self.scale)
+
+    def frequency(self, key):
+        '''
+        Returns the current frequency of a sentence, 0 if it doesn't exist, reading the root and the scale from the same snapshot
+        '''
+        current, scale = self.snapshot
+        for char in key:
+            current = current.links.get(char)
+            if not current:
+                return 0
+        if "" not in current.links:
+            return 0
+        return current.links[""].count * scale
+
+class CatsTrieCursor:
+    '''
+    A class representing the prompt of one typing session in a CatsTrie, which remembers the Node reached by every character typed
+    so far, so that typing or deleting a character doesn't walk the prompt from the root again
+
+    Author: Ooi Yu Zhang
+    '''
+    def __init__(self, trie, prompt="") -> None:
+        '''
+        Constructor for the CatsTrieCursor class
+
+        Input:
+            trie: the CatsTrie being typed into
+            prompt: a string representing the characters typed so far
+        '''
+        self.trie = trie
+        # Characters typed so far
+        self.chars = []
+        # Node reached by every prefix of the characters typed so far, None once the prefix doesn't exist
+        self.nodes = [trie.root]
+        for char in prompt:
+            self.push(char)
+
+    def push(self, char) -> None:
+        '''
+        Types one more character in O(1)
+        '''
+        current = self.nodes[-1]
+        self.chars.append(char)
+        self.nodes.append(current.links.get(char) if current else None)
+
+    def pop(self) -> None:
+        '''
+        Deletes the last character typed in O(1)
+        '''
+        if self.chars:
+            self.chars.pop()
+            self.nodes.pop()
+
+    def prompt(self) -> str:
+        '''
+        Returns the characters typed so far
+        '''
+        return "".join(self.chars)
+
+    def autoComplete(self):
+        '''
+        Returns the autocompleted sentence from the characters typed so far, the same as CatsTrie.autoComplete, in O(X+Y) only to
+        write out the sentence
+        '''
+        current = self.nodes[-1]
+        if not current:
+            return None
+        return self.trie.complete(current, self.prompt())
+
+class CompactCatsTrie:
+    '''
+    A class representing a compact, read-only CatsTrie, where the Nodes are stored in flat arrays instead of objects
+
+    Author: Ooi Yu Zhang
+    '''
+    # Header of a saved CompactCatsTrie: magic, version, byte order check, number of Nodes and root slot
+    HEADER = struct.Struct("=8sIIQQ")
+    MAGIC = b"CATSTRIE"
+    VERSION = 1
+    BYTE_ORDER = 0x01020304
+
+    def __init__(self, corpus, presorted=False) -> None:
+        '''
+        Function description:
+            This function is a constructor for the CompactCatsTrie class which builds the Trie from a corpus.
+
+        Approach description:
+            Every Node of a CatsTrie is an object with a dictionary of links, which takes hundreds of bytes per character. Here, every Node
+            is a slot in five flat arrays instead: the code point of its letter, the frequency of the sentence ending at it, the start and
+            length of the block of slots holding its children (sorted by letter), and the slot of its next Node for autocomplete, or -1 if
+            the autocompleted sentence ends at the Node itself. That is 24 bytes per Node.
+            Like CatsTrie.from_corpus, the distinct sentences are visited in sorted order with a stack of the Nodes of the previous sentence.
+            When a Node is popped off the stack, all of its children are final, so they are written to the arrays as one contiguous block
+            and the Node's autocomplete is computed from them. The root is written last, in a block of its own.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            corpus: a list of strings, a list of tuples in the form of (sentence, frequency), or a dictionary from sentence to frequency.
+                    Unlike CatsTrie.from_corpus, frequencies must be integers, and a ValueError is raised for a float or negative total
+            presorted: a boolean indicating whether corpus is an iterable of (sentence, frequency) tuples already sorted by sentence, which is
+                       then streamed without aggregating it in memory first
+
+        Time complexity: O(N + UM log U) where N is the number of items in corpus, U is the number of distinct sentences and M is the number
+                         of characters in the longest sentence, O(NM) if presorted
+        Aux space complexity: O(UM) where U is the number of distinct sentences and M is the number of characters in the longest sentence
+        '''
+        # Code point of the letter of every Node
+        self.labels = array("I")
+        # Frequency of the sentence ending at every Node, 0 if there is none
+        self.counts = array("Q")
+        # Start and length of the block of children of every Node
+        self.first = array("I")
+        self.degree = array("I")
+        # Slot of the next Node for autocomplete, -1 if the autocompleted sentence ends at the Node
+        self.next = array("i")
+
+        if presorted:
+            items = corpus
         else:
+            counts = count_sentences(corpus)
+            items = ((key, counts[key]) for key in sorted(counts))
+
+        # Stack of pending Nodes as [code point, frequency, list of finished children] from the root to the last letter of the previous sentence
+        stack = [[0, 0, []]]
+        previous = ""
+        for key, frequency in items:
+            # Frequencies are stored as unsigned 64-bit integers
+            if not isinstance(frequency, int) or not 0 <= frequency < 2 ** 64:
+                raise ValueError("Frequency of " + repr(key) + " must be a non-negative 64-bit integer, got " + repr(frequency))
+            if not frequency:
+                continue
+            if key < previous:
+                raise ValueError("Sentences are not sorted: " + repr(key) + " after " + repr(previous))
+            # Length of the longest common prefix with the previous sentence
+            common = 0
+            while common < min(len(key), len(previous)) and key[common] == previous[common]:
+                common += 1
+            # Nodes past the common prefix are final, write their children
+            while len(stack) > common + 1:
+                finished = self.finish(stack.pop())
+                stack[-1][2].append(finished)
+            for i in range(common, len(key)):
+                stack.append([ord(key[i]), 0, []])
+            # Frequency of the sentence, added up if it repeats
+            stack[-1][1] += frequency
+            previous = key
+
+        while len(stack) > 1:
+            finished = self.finish(stack.pop())
+            stack[-1][2].append(finished)
+        # The root is written last, in a block of its own
+        root = self.finish(stack.pop())
+        self.root = len(self.labels)
+        self.write([root])
+
+    def finish(self, pending):
+        '''
+        Writes the children of a pending Node as one block and returns the Node as (code point, frequency, first, degree, next, highest frequency)
+        '''
+        label, count, children = pending
+        first = len(self.labels)
+        self.write(children)
+        # Autocomplete is the sentence ending here, unless a child has a higher frequency (children are in order of code point)
+        best, nxt = count, -1
+        for j in range(len(children)):
+            if children[j][5] > best:
+                best, nxt = children[j][5], first + j
+        return (label, count, first, len(children), nxt, best)
+
+    def write(self, block) -> None:
+        '''
+        Appends a block of finished Nodes to the arrays
+        '''
+        for label, count, first, degree, nxt, best in block:
+            self.labels.append(label)
+            self.counts.append(count)
+            self.first.append(first)
+            self.degree.append(degree)
+            self.next.append(nxt)
+
+    def save(self, path) -> None:
+        '''
+        Function description:
+            This function writes the CompactCatsTrie to a file which can be opened with CompactCatsTrie.open.
+
+        Approach description:
+            The file is a fixed-size header followed by the raw bytes of the arrays, the 8-byte frequencies first so that every array
+            starts at an offset that is a multiple of its item size. The arrays are written as they are in memory, so the file can be used
+            in place once mapped.
+
+        Input:
+            path: a string representing the file to write to
+
+        Time complexity: O(T) where T is the number of Nodes
+        Aux space complexity: O(1)
+        '''
+        with open(path, "wb") as file:
+            file.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.BYTE_ORDER, len(self), self.root))
+            for a in (self.counts, self.labels, self.first, self.degree, self.next):
+                file.write(a.tobytes())
+
+    @classmethod
+    def open(cls, path):
+        '''
+        Function description:
+            This function opens a CompactCatsTrie saved with CompactCatsTrie.save without reading or copying its arrays.
+
+        Approach description:
+            The file is memory-mapped read-only, and every array is a memoryview over its range of the mapping, cast to the same type
+            of item as the array it was saved from. Queries then read the file directly through the page cache, so opening is instant
+            regardless of the size of the Trie, and several processes opening the same file share a single copy of it in memory.
+
+        Input:
+            path: a string representing the file to open
+
+        Output:
+            trie: a CompactCatsTrie backed by the file, which gives the same autocomplete as the one saved
+
+        Time complexity: O(1)
+        Aux space complexity: O(1)
+        '''
+        trie = cls.__new__(cls)
+        trie.file = open(path, "rb")
+        view = None
+        views = []
+        try:
+            trie.mapping = mmap.mmap(trie.file.fileno(), 0, access=mmap.ACCESS_READ)
+            view = memoryview(trie.mapping)
+
+            magic, version, byte_order, nodes, root = cls.HEADER.unpack_from(view)
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError(path + " is not a saved CompactCatsTrie")
+            if byte_order != cls.BYTE_ORDER:
+                raise ValueError(path + " was saved on a machine with a different byte order")
+            # Five arrays of 8+4+4+4+4 bytes per node follow the header
+            if len(view) < cls.HEADER.size + nodes * 24:
+                raise ValueError(path + " is truncated")
+
+            offset = cls.HEADER.size
+            for typecode in ("Q", "I", "I", "I", "i"):
+                size = nodes * array(typecode).itemsize
+                views.append(view[offset:offset + size].cast(typecode))
+                offset += size
+        except Exception:
+            # Release the views of the mapping so that it and the file can be closed
+            for partial in views:
+                partial.release()
+            if view is not None:
+                view.release()
+            trie.close()
+            raise
+        view.release()
+        trie.counts, trie.labels, trie.first, trie.degree, trie.next = views
+        trie.root = root
+        return trie
+
+    def close(self) -> None:
+        '''
+        Closes the file of a CompactCatsTrie opened with CompactCatsTrie.open
+        '''
+        for name in ("counts", "labels", "first", "degree", "next"):
+            if isinstance(getattr(self, name, None), memoryview):
+                getattr(self, name).release()
+        if getattr(self, "mapping", None):
+            self.mapping.close()
+            self.mapping = None
+        if getattr(self, "file", None):
+            self.file.close()
+            self.file = None
+
+    def __len__(self) -> int:
+        '''
+        Returns the number of Nodes in the Trie
+        '''
+        return len(self.labels)
+
+    def nbytes(self) -> int:
+        '''
+        Returns the number of bytes used by the arrays of the Trie
+        '''
+        return sum(len(a) * a.itemsize for a in (self.labels, self.counts, self.first, self.degree, self.next))
+
+    def find(self, prompt):
+        '''
+        Returns the slot of the Node reached by walking down prompt, else None
+        '''
+        current = self.root
+        for char in prompt:
+            code = ord(char)
+            # Binary search for the letter amongst the sorted children
+            lo = self.first[current]
+            hi = lo + self.degree[current]
+            current = bisect_left(self.labels, code, lo, hi)
+            if current == hi or self.labels[current] != code:
+                return None
+        return current
+
+    def autoComplete(self, prompt):
+        '''
+        Function description:
+            This function returns a string that represents the autocompleted sentence from the prompt, the same as CatsTrie.autoComplete
+
+        Approach description:
+            The prompt is walked down from the root, with a binary search for every letter amongst the children of the current Node. From
+            the Node reached, the stored next slots are followed until the slot at which the autocompleted sentence ends.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            prompt: a string representing the incomplete sentence that is to be completed by the CompactCatsTrie
+
+        Output:
+            res: a string representing the autocompleted sentence from the given prompt, else None
+
+        Time complexity:
+            O(X log S + Y) where X is the length of the prompt, S is the size of the alphabet and Y is the length of the most frequent
+            sentence in sentences that begins with prompt
+        Aux space complexity: O(Y) where Y is the length of the most frequent sentence in sentences that begins with prompt
+        '''
+        current = self.find(prompt)
+        # Prompt does not exist, or there are no sentences at all
+        if current is None or (self.next[current] == -1 and not self.counts[current]):
             return None
+
+        res = [prompt]
+        while self.next[current] != -1:
+            current = self.next[current]
+            res.append(chr(self.labels[current]))
+        return "".join(res)
+
+##############################
+########### Tests ############
+##############################
+def test_autocomplete_ties():
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx"]
+    mycattrie = CatsTrie(sentences)
+    # "dbcef" and "xxx" both occur twice, "dbcef" is lexicographically smaller
+    expected = ["dbcef", "abazacy", "abazacy", "xxx", None]
+    res = [mycattrie.autoComplete(prompt) for prompt in ["", "a", "ab", "x", "z"]]
+    return res == expected
+
+def test_autocomplete_long_sentence():
+    # Longer than the recursion limit
+    sentences = ["a" * 5000, "a" * 5000, "ab"]
+    mycattrie = CatsTrie(sentences)
+    return mycattrie.autoComplete("a") == "a" * 5000 and mycattrie.autoComplete("ab") == "ab"
+
+def test_from_corpus():
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx"]
+    mycattrie = CatsTrie(sentences)
+    # Same trie from raw sentences and from frequencies
+    bulk_1 = CatsTrie.from_corpus(sentences)
+    bulk_2 = CatsTrie.from_corpus([("xxx", 2), ("abc", 1), ("dbcef", 2), ("abazacy", 1), ("xzz", 1), ("xyz", 1)])
+    prompts = ["", "a", "ab", "abc", "d", "x", "xy", "z"]
+    expected = [mycattrie.autoComplete(prompt) for prompt in prompts]
+    return [bulk_1.autoComplete(prompt) for prompt in prompts] == expected and [bulk_2.autoComplete(prompt) for prompt in prompts] == expected
+
+def test_from_shards():
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx", "a", "", "a" * 5000]
+    mycattrie = CatsTrie.from_shards(sentences, workers=2, prefix_length=2)
+    prompts = ["", "a", "ab", "x", "xy", "d", "q", "aa"]
+    res_1 = [mycattrie.autoComplete(prompt) for prompt in prompts] == [CatsTrie(sentences).autoComplete(prompt) for prompt in prompts]
+    # Pickling flattens the Nodes, so sentences deeper than the recursion limit can be pickled
+    import pickle
+    res_2 = pickle.loads(pickle.dumps(mycattrie)).autoComplete("aa") == "a" * 5000
+    return res_1 and res_2
+
+def test_compactcatstrie():
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx"]
+    mycattrie = CatsTrie(sentences)
+    compact = CompactCatsTrie(sentences)
+    prompts = ["", "a", "ab", "abc", "abcd", "d", "x", "xy", "z"]
+    res_1 = [compact.autoComplete(prompt) for prompt in prompts] == [mycattrie.autoComplete(prompt) for prompt in prompts]
+    # Frequencies are stored as integers, so other frequencies are refused
+    res_2 = True
+    for frequency in (2.5, -1):
+        try:
+            CompactCatsTrie([("ab", frequency)])
+            res_2 = False
+        except ValueError:
+            pass
+    return res_1 and res_2
+
+def test_compactcatstrie_open():
+    import os
+    import tempfile
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx"]
+    compact = CompactCatsTrie(sentences)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "catstrie.bin")
+        compact.save(path)
+        mapped = CompactCatsTrie.open(path)
+        prompts = ["", "a", "ab", "abc", "abcd", "d", "x", "xy", "z"]
+        res_1 = [mapped.autoComplete(prompt) for prompt in prompts] == [compact.autoComplete(prompt) for prompt in prompts]
+        mapped.close()
+
+        # Empty, cut off and truncated files are refused when opened
+        with open(path, "rb") as file:
+            data = file.read()
+        res_2 = True
+        for length in (0, 8, len(data) - 1):
+            with open(path, "wb") as file:
+                file.write(data[:length])
+            try:
+                CompactCatsTrie.open(path).close()
+                res_2 = False
+            except (ValueError, struct.error):
+                pass
+    return res_1 and res_2
+
+def test_autocomplete_topk():
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx", "ab"]
+    mycattrie = CatsTrie(sentences)
+    res_1 = mycattrie.autoComplete_topk("", 4) == ["dbcef", "xxx", "ab", "abazacy"]
+    res_2 = mycattrie.autoComplete_topk("x", 10) == ["xxx", "xyz", "xzz"]
+    res_3 = mycattrie.autoComplete_topk("q", 3) == []
+    return res_1 and res_2 and res_3
+
+def test_autocomplete_batch():
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx"]
+    mycattrie = CatsTrie(sentences)
+    prompts = ["xy", "abc", "", "a", "ab", "abcd", "q", "x", "ab"]
+    return mycattrie.autoComplete_batch(prompts) == [mycattrie.autoComplete(prompt) for prompt in prompts]
+
+def test_autocomplete_cursor():
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx"]
+    mycattrie = CatsTrie(sentences)
+    cursor = mycattrie.cursor()
+    res = [cursor.autoComplete()]
+    for char in "abcd":
+        cursor.push(char)
+        res.append(cursor.autoComplete())
+    # Deleting the "d" makes the prompt exist again
+    cursor.pop()
+    res.append(cursor.autoComplete())
+    return res == ["dbcef", "abazacy", "abazacy", "abc", None, "abc"]
+
+def test_autocomplete_cache():
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx"]
+    mycattrie = CatsTrie(sentences, cache_size=2)
+    res_1 = [mycattrie.autoComplete(prompt) for prompt in ["ab", "x", "ab"]] == ["abazacy", "xxx", "abazacy"]
+    # Inserting "abc" again makes it the autocomplete of "ab" but not of "x"
+    mycattrie.insert("abc")
+    res_2 = mycattrie.autoComplete("ab") == "abc" and mycattrie.autoComplete("x") == "xxx"
+    res_3 = mycattrie.cache_info() == {"hits": 2, "misses": 3, "size": 2, "maxsize": 2}
+    return res_1 and res_2 and res_3
+
+def test_autocomplete_unicode():
+    sentences = ["café", "cafe", "café au lait", "café au lait", "Café", "中文", "中国", "中国"]
+    mycattrie = CatsTrie(sentences)
+    compact = CompactCatsTrie(sentences)
+    prompts = ["caf", "café ", "C", "中", "中文", "ça", ""]
+    expected = ["café au lait", "café au lait", "Café", "中国", "中文", None, "café au lait"]
+    res_1 = [mycattrie.autoComplete(prompt) for prompt in prompts] == expected
+    res_2 = [compact.autoComplete(prompt) for prompt in prompts] == expected
+    # Only the letters that follow "caf" are linked, "e" comes before "é" on ties
+    res_3 = sorted(mycattrie.find("caf").links) == ["e", "é"] and mycattrie.autoComplete_topk("caf", 3) == ["café au lait", "cafe", "café"]
+    return res_1 and res_2 and res_3
+
+def test_autocomplete_update():
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx"]
+    mycattrie = CatsTrie(sentences, cache_size=4)
+    res_1 = mycattrie.autoComplete("") == "dbcef" and mycattrie.autoComplete("x") == "xxx"
+    mycattrie.increment("xyz", 2)
+    mycattrie.increment("dbcef", -1)
+    res_2 = mycattrie.autoComplete("") == "xyz" and mycattrie.autoComplete("x") == "xyz" and mycattrie.autoComplete("d") == "dbcef"
+    # Removing a sentence removes the letters that only it used
+    mycattrie.remove("dbcef")
+    res_3 = mycattrie.autoComplete("d") is None and "d" not in mycattrie.root.links
+    # Decay scales every frequency, so only sentences inserted afterwards can overtake
+    mycattrie.decay(0.25)
+    mycattrie.insert("abc")
+    res_4 = mycattrie.frequency("xyz") == 0.75 and mycattrie.frequency("abc") == 1.25 and mycattrie.autoComplete("") == "abc"
+    # Folding the scale back into the frequencies clears the cache
+    mycattrie.decay(2.0 ** -300)
+    res_5 = mycattrie.scale == 1.0 and mycattrie.cache_info()["size"] == 0 and mycattrie.autoComplete("") == "abc"
+    return res_1 and res_2 and res_3 and res_4 and res_5
+
+def test_autocomplete_fuzzy():
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx"]
+    mycattrie = CatsTrie(sentences)
+    # "dc" is one substitution from "db", "xxx" and "dbcef" are equally frequent but only "xxx" is within one edit of "xxd"
+    res_1 = mycattrie.autoComplete("dc") is None and mycattrie.autoComplete_fuzzy("dc") == "dbcef"
+    res_2 = mycattrie.autoComplete_fuzzy("xxd") == "xxx" and mycattrie.autoComplete_fuzzy("azc", 2) == "dbcef"
+    res_3 = mycattrie.autoComplete_fuzzy("qqq", 2) is None and mycattrie.autoComplete_fuzzy("ab", 0) == "abazacy"
+    return res_1 and res_2 and res_3
+
+def test_snapshotcatstrie():
+    sentences = ["abc", "abazacy", "dbcef", "xzz", "dbcef", "xyz", "xxx", "xxx"]
+    mycattrie = SnapshotCatsTrie(sentences)
+    root = mycattrie.root
+    mycattrie.increment("xyz", 2)
+    mycattrie.remove("dbcef")
+    # The root read before the updates still gives the old autocomplete
+    res_1 = mycattrie.complete(root, "") == "dbcef" and mycattrie.complete(root.links["x"], "x") == "xxx"
+    res_2 = mycattrie.autoComplete("") == "xyz" and mycattrie.autoComplete("d") is None and mycattrie.frequency("xyz") == 3
+    return res_1 and res_2
+
+#######################################################################
+
+#print(test_autocomplete_ties())
+#print(test_autocomplete_long_sentence())
+#print(test_from_corpus())
+#print(test_from_shards())
+#print(test_compactcatstrie())
+#print(test_compactcatstrie_open())
+#print(test_autocomplete_topk())
+#print(test_autocomplete_batch())
+#print(test_autocomplete_cursor())
+#print(test_autocomplete_cache())
+#print(test_autocomplete_unicode())
+#print(test_autocomplete_update())
+#print(test_autocomplete_fuzzy())
+#print(test_snapshotcatstrie())
+
+#######################################################################
@@ -0,0 +1,422 @@
+#################################
+############ Imports ############
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from autocomplete import CatsTrie, CompactCatsTrie, SnapshotCatsTrie
+from dynamic_programming import select_sections, select_sections_batch
+from network_flow import MaxThroughputSolver, maxThroughput
+from optimal_route import optimalRoute
+try:
+    import numpy
+except ImportError:
+    numpy = None
+#################################
+#################################
+
+##############################
+######### Generators #########
+##############################
+def random_grid(rows, columns, seed=0, high=100):
+    '''
+    Generates a seeded occupancy grid with values from 0 to high
+    '''
+    generator = random.Random(seed)
+    return [[generator.randint(0, high) for j in range(columns)] for i in range(rows)]
+
+def random_sentences(count, length=20, alphabet="abcdefghijklmnopqrstuvwxyz", vocabulary=None, seed=0):
+    '''
+    Generates a seeded corpus of count sentences of 1 to length characters drawn from alphabet. If vocabulary is given, the sentences
+    are drawn from that many distinct sentences so that the corpus contains duplicates like a real one
+    '''
+    generator = random.Random(seed)
+    def sentence():
+        return "".join(generator.choice(alphabet) for i in range(generator.randint(1, length)))
+    if vocabulary is None:
+        return [sentence() for i in range(count)]
+    distinct = [sentence() for i in range(vocabulary)]
+    # Skewed choice so that some sentences are much more frequent than others
+    return [distinct[int(len(distinct) * generator.random() ** 3)] for i in range(count)]
+
+def random_flow_network(vertices, channels, seed=0, high=100):
+    '''
+    Generates a seeded input for maxThroughput as a tuple of (connections, maxIn, maxOut, origin, targets). A chain through every data
+    centre is included so that all of them can be reached from the origin
+    '''
+    generator = random.Random(seed)
+    connections = [(i, i + 1, generator.randint(1, high)) for i in range(vertices - 1)]
+    while len(connections) < channels:
+        a = generator.randrange(vertices)
+        b = generator.randrange(vertices)
+        if a != b:
+            connections.append((a, b, generator.randint(1, high)))
+    maxIn = [generator.randint(1, high) for i in range(vertices)]
+    maxOut = [generator.randint(1, high) for i in range(vertices)]
+    targets = generator.sample(range(1, vertices), max(1, vertices // 10))
+    return connections, maxIn, maxOut, 0, targets
+
+def random_layered_flow_network(layers, width, degree=5, seed=0, high=100):
+    '''
+    Generates a seeded input for maxThroughput as a tuple of (connections, maxIn, maxOut, origin, targets), where the origin feeds a first
+    layer of width data centres, every data centre has channels to degree data centres of the next layer (possibly repeated), and the last layer are the targets.
+    The data centres themselves never limit the flow, so the maximum flow needs many augmenting paths
+    '''
+    generator = random.Random(seed)
+    vertices = layers * width + 1
+    connections = [(0, 1 + j, generator.randint(1, high)) for j in range(width)]
+    for layer in range(layers - 1):
+        for j in range(width):
+            # Channel to the data centre in the same position, so that every data centre can be reached
+            for k in [j] + generator.sample(range(width), degree - 1):
+                connections.append((1 + layer * width + j, 1 + (layer + 1) * width + k, generator.randint(1, high)))
+    limit = high * width * degree
+    targets = list(range(1 + (layers - 1) * width, vertices))
+    return connections, [limit] * vertices, [limit] * vertices, 0, targets
+
+def random_road_graph(locations, roads, seed=0, high=100):
+    '''
+    Generates a seeded input for optimalRoute as a tuple of (start, end, passengers, roads). A ring through every location is included
+    so that all of them exist in the graph and can be reached from each other
+    '''
+    generator = random.Random(seed)
+    def road(a, b):
+        # Carpool lanes are never slower than the normal lanes
+        alone = generator.randint(1, high)
+        return (a, b, alone, generator.randint(1, alone))
+    edges = [road(i, (i + 1) % locations) for i in range(locations)]
+    while len(edges) < roads:
+        a = generator.randrange(locations)
+        b = generator.randrange(locations)
+        if a != b:
+            edges.append(road(a, b))
+    passengers = generator.sample(range(locations), max(1, locations // 10))
+    start, end = generator.sample(range(locations), 2)
+    return start, end, passengers, edges
+
+##############################
+######### Measuring ##########
+##############################
+def time_call(function, *args, repeat=3, **kwargs):
+    '''
+    Returns the best wall-clock time in seconds out of repeat calls of function
+    '''
+    best = float("inf")
+    for i in range(repeat):
+        start = time.perf_counter()
+        function(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def peak_memory(function, *args, **kwargs) -> int:
+    '''
+    Returns the peak memory in bytes allocated by Python during one call of function
+    '''
+    tracemalloc.start()
+    try:
+        function(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def measure(name, size, function, *args, repeat=3, **kwargs):
+    '''
+    Times function and records its peak memory, returning a result that can be written to JSON
+    '''
+    seconds = time_call(function, *args, repeat=repeat, **kwargs)
+    # Measured separately as tracing allocations slows the call down
+    peak_bytes = peak_memory(function, *args, **kwargs)
+    print(name + " " + str(size) + ": " + format(seconds, ".4f") + "s, peak " + format(peak_bytes / 2 ** 20, ".2f") + "MiB")
+    return {"benchmark": name, "size": list(size), "seconds": seconds, "peak_bytes": peak_bytes}
+
+##############################
+######### Benchmarks #########
+##############################
+def benchmark_select_sections(sizes=((100, 100), (500, 200), (1000, 500)), engines=("memo", "parents", "numpy"), slow_cells=100000,
+                              repeat=3):
+    '''
+    Times every engine of select_sections on grids of the given sizes, skipping "memo" above slow_cells sections as its copies of the
+    lists of locations take gigabytes there
+    '''
+    results = []
+    for rows, columns in sizes:
+        grid = random_grid(rows, columns, seed=rows * columns)
+        slow = rows * columns > slow_cells
+        # "parents" gives the same results as "memo" in O(nm) memory, and is checked against it on the smaller grids
+        expected = select_sections(grid, engine="parents" if slow else "memo")
+        for engine in engines:
+            if engine == "memo" and slow:
+                continue
+            # The "numpy" engine is only available with numpy installed
+            if engine == "numpy" and numpy is None:
+                continue
+            # Every engine must agree with the reference engine before their times are compared
+            if select_sections(grid, engine=engine) != expected:
+                raise AssertionError("Engine " + engine + " disagrees on a " + str(rows) + "x" + str(columns) + " grid")
+            results.append(measure("select_sections[" + engine + "]", (rows, columns), select_sections, grid, engine=engine, repeat=repeat))
+    return results
+
+def benchmark_select_sections_batch(batches=(100, 1000, 5000), rows=10, columns=10, repeat=3):
+    '''
+    Times one select_sections call per grid against a single select_sections_batch call on batches of small grids, which requires numpy
+    '''
+    results = []
+    if numpy is None:
+        return results
+    for batch in batches:
+        grids = [random_grid(rows, columns, seed=b) for b in range(batch)]
+        if select_sections_batch(grids) != [select_sections(grid) for grid in grids]:
+            raise AssertionError("Batch disagrees with select_sections on a batch of " + str(batch) + " grids")
+        results.append(measure("select_sections[loop]", (batch, rows, columns), lambda: [select_sections(grid) for grid in grids], repeat=repeat))
+        results.append(measure("select_sections_batch", (batch, rows, columns), select_sections_batch, grids, repeat=repeat))
+    return results
+
+def benchmark_catstrie(sizes=(10000, 50000, 200000), repeat=3):
+    '''
+    Times building a CatsTrie one sentence at a time and in bulk, and a CompactCatsTrie, and answering one autoComplete query per sentence
+    on corpora of the given sizes
+    '''
+    results = []
+    for size in sizes:
+        sentences = random_sentences(size, vocabulary=size // 4, seed=size)
+        prompts = [sentence[:len(sentence) // 2] for sentence in sentences]
+        results.append(measure("CatsTrie", (size,), CatsTrie, sentences, repeat=repeat))
+        results.append(measure("CatsTrie.from_corpus", (size,), CatsTrie.from_corpus, sentences, repeat=repeat))
+        results.append(measure("CatsTrie.from_shards[workers]", (size,), CatsTrie.from_shards, sentences, workers=os.cpu_count(), repeat=repeat))
+        trie = CatsTrie(sentences)
+        results.append(measure("CatsTrie.autoComplete", (size,), lambda: [trie.autoComplete(prompt) for prompt in prompts], repeat=repeat))
+        results.append(measure("CompactCatsTrie", (size,), CompactCatsTrie, sentences, repeat=repeat))
+        compact = CompactCatsTrie(sentences)
+        results.append(measure("CompactCatsTrie.autoComplete", (size,), lambda: [compact.autoComplete(prompt) for prompt in prompts], repeat=repeat))
+        # Opening a saved trie should take the same time whatever its size
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "catstrie.bin")
+            compact.save(path)
+            results.append(measure("CompactCatsTrie.open", (size,), lambda: CompactCatsTrie.open(path).close(), repeat=repeat))
+            mapped = CompactCatsTrie.open(path)
+            results.append(measure("CompactCatsTrie.open.autoComplete", (size,), lambda: [mapped.autoComplete(prompt) for prompt in prompts],
+                                   repeat=repeat))
+            mapped.close()
+    return results
+
+def benchmark_catstrie_bursts(sizes=(100, 500, 2000), length=200, repeat=3):
+    '''
+    Times autoComplete against autoComplete_batch on bursts of keystrokes, every prefix of the given number of long sentences
+    '''
+    results = []
+    for size in sizes:
+        sentences = random_sentences(size * 10, length=length, vocabulary=size * 2, seed=size)
+        trie = CatsTrie.from_corpus(sentences)
+        bursts = [sentence[:i] for sentence in sentences[:size] for i in range(len(sentence) + 1)]
+        results.append(measure("CatsTrie.autoComplete[bursts]", (size, length), lambda: [trie.autoComplete(prompt) for prompt in bursts], repeat=repeat))
+        results.append(measure("CatsTrie.autoComplete_batch[bursts]", (size, length), trie.autoComplete_batch, bursts, repeat=repeat))
+    return results
+
+def benchmark_catstrie_fuzzy(distances=(0, 1, 2), size=200000, queries=200, repeat=3):
+    '''
+    Times autoComplete_fuzzy within the given edit distances on prompts with one mistyped letter
+    '''
+    results = []
+    sentences = random_sentences(size, vocabulary=size // 4, seed=size)
+    trie = CatsTrie.from_corpus(sentences)
+    # Add a letter outside of the alphabet to half of every sentence, so that the prompts never exist
+    prompts = [sentence[:len(sentence) // 2] + "#" for sentence in sentences[:queries]]
+    for distance in distances:
+        results.append(measure("CatsTrie.autoComplete_fuzzy", (size, distance), lambda: [trie.autoComplete_fuzzy(prompt, distance) for prompt in prompts], repeat=repeat))
+    return results
+
+def benchmark_catstrie_threads(readers=(1, 2, 4, 8), size=50000, repeat=3):
+    '''
+    Times answering one autoComplete query per sentence of a SnapshotCatsTrie split across the given numbers of reader threads, while
+    one writer thread keeps inserting sentences
+    '''
+    results = []
+    sentences = random_sentences(size, vocabulary=size // 4, seed=size)
+    updates = random_sentences(size, vocabulary=size // 4, seed=size + 1)
+    prompts = [sentence[:len(sentence) // 2] for sentence in sentences]
+    trie = SnapshotCatsTrie.from_corpus(sentences)
+
+    def serve(count):
+        done = threading.Event()
+        def write():
+            for sentence in updates:
+                if done.is_set():
+                    return
+                trie.insert(sentence)
+        def read(chunk):
+            for prompt in chunk:
+                trie.autoComplete(prompt)
+        writer = threading.Thread(target=write)
+        threads = [threading.Thread(target=read, args=(prompts[i::count],)) for i in range(count)]
+        writer.start()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        done.set()
+        writer.join()
+
+    for count in readers:
+        results.append(measure("SnapshotCatsTrie.autoComplete[threads]", (count, size), serve, count, repeat=repeat))
+    return results
+
+def benchmark_maxthroughput(sizes=((1000, 5000), (5000, 25000), (20000, 100000)), repeat=3):
+    '''
+    Times maxThroughput on flow networks of the given (data centres, channels) sizes
+    '''
+    results = []
+    for vertices, channels in sizes:
+        network = random_flow_network(vertices, channels, seed=vertices)
+        results.append(measure("maxThroughput", (vertices, channels), maxThroughput, *network, repeat=repeat))
+    return results
+
+def benchmark_maxthroughput_engines(sizes=((10, 50), (20, 100), (40, 200)), engines=("ford_fulkerson", "dinic", "push_relabel"),
+                                    slow_channels=10000, repeat=3):
+    '''
+    Times every engine of maxThroughput on both flow network representations on layered flow networks of the given (layers, width)
+    sizes, skipping "ford_fulkerson" above slow_channels channels as it takes minutes there
+    '''
+    results = []
+    for layers, width in sizes:
+        network = random_layered_flow_network(layers, width, seed=layers * width)
+        channels = len(network[0])
+        expected = maxThroughput(*network, engine="dinic")
+        for engine in engines:
+            if engine == "ford_fulkerson" and channels > slow_channels:
+                continue
+            for compact in (False, True):
+                name = engine + ",compact" if compact else engine
+                # Every engine must agree before their times are compared
+                if maxThroughput(*network, engine=engine, compact=compact) != expected:
+                    raise AssertionError("Engine " + name + " disagrees on " + str(layers) + " layers of " + str(width))
+                results.append(measure("maxThroughput[" + name + "]", (layers * width + 1, channels), maxThroughput, *network, engine=engine,
+                                       compact=compact, repeat=repeat))
+    return results
+
+def benchmark_maxthroughput_updates(sizes=((10, 50), (20, 100), (40, 200)), updates=20, engine="dinic", repeat=3):
+    '''
+    Times applying the given number of seeded changes to channel capacities and data centre limits with a MaxThroughputSolver against
+    rerunning maxThroughput after every change, on layered flow networks of the given (layers, width) sizes
+    '''
+    results = []
+    for layers, width in sizes:
+        connections, maxIn, maxOut, origin, targets = random_layered_flow_network(layers, width, seed=layers * width)
+        generator = random.Random(layers * width)
+        # Half of the changes set the capacity of a channel, the other half the limits of a data centre
+        changes = []
+        for _ in range(updates):
+            if generator.random() < 0.5:
+                (u, v, w) = generator.choice(connections)
+                changes.append((True, u, v, generator.randint(0, 100)))
+            else:
+                changes.append((False, generator.randrange(len(maxIn)), generator.randint(0, 100), generator.randint(0, 100)))
+
+        def solve():
+            solver = MaxThroughputSolver(connections, maxIn, maxOut, origin, targets, engine)
+            return [solver.set_capacity(a, b, c) if channel else solver.set_node_limits(a, b, c) for (channel, a, b, c) in changes]
+
+        def rebuild():
+            current = list(connections)
+            limitsIn = list(maxIn)
+            limitsOut = list(maxOut)
+            flows = []
+            for (channel, a, b, c) in changes:
+                if channel:
+                    # set_capacity changes every channel from a to b
+                    current = [(u, v, c) if (u, v) == (a, b) else (u, v, w) for (u, v, w) in current]
+                else:
+                    limitsIn[a] = b
+                    limitsOut[a] = c
+                flows.append(maxThroughput(current, limitsIn, limitsOut, origin, targets, engine=engine, compact=True))
+            return flows
+
+        # Both must agree after every change before their times are compared
+        if solve() != rebuild():
+            raise AssertionError("MaxThroughputSolver disagrees on " + str(layers) + " layers of " + str(width))
+        size = (layers * width + 1, len(connections), updates)
+        results.append(measure("MaxThroughputSolver[updates]", size, solve, repeat=repeat))
+        results.append(measure("maxThroughput[updates]", size, rebuild, repeat=repeat))
+    return results
+
+def benchmark_optimalroute(sizes=((1000, 4000), (5000, 20000), (20000, 80000)), repeat=3):
+    '''
+    Times optimalRoute on road graphs of the given (locations, roads) sizes
+    '''
+    results = []
+    for locations, roads in sizes:
+        graph = random_road_graph(locations, roads, seed=locations)
+        results.append(measure("optimalRoute", (locations, roads), optimalRoute, *graph, repeat=repeat))
+    return results
+
+BENCHMARKS = {
+    "select_sections": benchmark_select_sections,
+    "select_sections_batch": benchmark_select_sections_batch,
+    "catstrie": benchmark_catstrie,
+    "catstrie_bursts": benchmark_catstrie_bursts,
+    "catstrie_fuzzy": benchmark_catstrie_fuzzy,
+    "catstrie_threads": benchmark_catstrie_threads,
+    "maxthroughput": benchmark_maxthroughput,
+    "maxthroughput_engines": benchmark_maxthroughput_engines,
+    "maxthroughput_updates": benchmark_maxthroughput_updates,
+    "optimalroute": benchmark_optimalroute,
+}
+
+def run(names=None, repeat=3):
+    '''
+    Runs the named benchmarks (all of them by default) and returns their results along with details of the machine
+    '''
+    results = []
+    for name in names or BENCHMARKS:
+        results.extend(BENCHMARKS[name](repeat=repeat))
+    return {
+        "python": sys.version,
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+
+def compare(baseline, current, tolerance=1.25):
+    '''
+    Returns the results of current that are slower or use more memory than the same result in baseline by more than tolerance times
+    '''
+    previous = {(r["benchmark"], tuple(r["size"])): r for r in baseline["results"]}
+    regressions = []
+    for result in current["results"]:
+        before = previous.get((result["benchmark"], tuple(result["size"])))
+        if not before:
+            continue
+        for key in ("seconds", "peak_bytes"):
+            if result[key] > before[key] * tolerance:
+                regressions.append((result["benchmark"], result["size"], key, before[key], result[key]))
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the algorithms in this repository")
+    parser.add_argument("benchmarks", nargs="*", help="benchmarks to run out of " + ", ".join(BENCHMARKS) + ", all of them by default")
+    parser.add_argument("--repeat", type=int, default=3, help="number of timed calls, the best of which is kept")
+    parser.add_argument("--output", default="benchmark_results.json", help="file to write the results to as JSON")
+    parser.add_argument("--baseline", help="results of a previous run to check for regressions against")
+    parser.add_argument("--tolerance", type=float, default=1.25, help="ratio to the baseline above which a result is a regression")
+    args = parser.parse_args()
+
+    for name in args.benchmarks:
+        if name not in BENCHMARKS:
+            parser.error("unknown benchmark " + name)
+
+    report = run(args.benchmarks, args.repeat)
+    with open(args.output, "w") as file:
+        json.dump(report, file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(json.load(file), report, args.tolerance)
+        for name, size, key, before, after in regressions:
+            print("Regression in " + name + " " + str(size) + ": " + key + " went from " + str(before) + " to " + str(after))
+        if regressions:
+            sys.exit(1)
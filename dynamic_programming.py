@@ -1,4 +1,19 @@
-def select_sections(prob):
+#####################
+###### Imports ######
+#####################
+from array import array
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import heapq
+from itertools import islice
+from math import inf
+import mmap
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+def select_sections(prob, engine="memo", path=True):
     '''
         Function description:
             This function returns a list containing the minimum total occupancy for the selected sections to be removed and a list of tuples in the form of (i, j)
@@ -21,6 +36,9 @@ def select_sections(prob):
 
         Input:
             prob: a list of lists where each list represents different rows of sections
+            engine: a string selecting the implementation, either "memo" for the table of lists below, "parents" for select_sections_parents
+                    or "numpy" for select_sections_vectorised
+            path: a boolean indicating whether the location of sections is needed, if not None is returned in its place
 
         Output:
             A list containing the minimum total occupancy for the selected sections to be removed and a list of tuples in the form of (i, j)
@@ -29,6 +47,14 @@ def select_sections(prob):
         Time complexity: O(nm) where n is the number of rows and m is the number of columns/aisles
         Aux space complexity: O(nm) where n is the number of rows and m is the number of columns/aisles
     '''
+    # Use another engine if requested
+    if engine == "numpy":
+        return select_sections_vectorised(prob, path)
+    elif engine == "parents":
+        return select_sections_parents(prob, path)
+    elif engine != "memo":
+        raise ValueError("Unknown engine: " + str(engine))
+
     # Memory for dynamic programing
     memo = [[[0, []] for i in range(len(prob[0]))] for i in range(len(prob) + 1)]
     # Looping through the memory and input list
@@ -62,10 +88,659 @@ def select_sections(prob):
     minimum_total_occupancy = res[0]
 
     # Initialise location of sections for removal
-    sections_location = res[1]
+    sections_location = res[1] if path else None
 
     return [minimum_total_occupancy, sections_location]
 
+def select_parent(total, rank, m) -> int:
+    '''
+    Returns the column of the section diagonal or vertical to column m in the previous row with the smallest (total, rank)
+    '''
+    best = m
+    if m > 0 and (total[m-1], rank[m-1]) < (total[best], rank[best]):
+        best = m - 1
+    if m < len(total) - 1 and (total[m+1], rank[m+1]) < (total[best], rank[best]):
+        best = m + 1
+    return best
+
+def rank_row(rank, offset):
+    '''
+    Ranks the lists of locations of a row by the rank of the list they extend in the previous row, then by their column
+    '''
+    columns = len(offset)
+    # Lists of locations grouped by the rank of the list they extend
+    buckets = [[] for m in range(len(rank))]
+    for m in range(columns):
+        buckets[rank[m + offset[m]]].append(m)
+
+    new_rank = [0] * columns
+    r = 0
+    for bucket in buckets:
+        for m in bucket:
+            new_rank[m] = r
+            r += 1
+    return new_rank
+
+def select_row(total, rank, row):
+    '''
+    Computes the totals, ranks and parent offsets of the next row of the dynamic programming table from the totals and ranks of the previous row
+    '''
+    columns = len(row)
+    new_total = [0] * columns
+    offset = [0] * columns
+    for m in range(columns):
+        # Compute smallest (total, rank) between values above current total occupancy
+        best = select_parent(total, rank, m)
+        new_total[m] = total[best] + row[m]
+        offset[m] = best - m
+    return new_total, rank_row(rank, offset), offset
+
+def select_sections_parents(prob, path=True):
+    '''
+        Function description:
+            This function returns the same result as select_sections, but only keeps two rows of totals in memory along with a compact array
+            of parent offsets instead of a list of locations for every cell.
+
+        Approach descriptions:
+            select_sections copies the whole list of locations from the row above into every cell, which costs O(n) per cell. Here, every cell
+            only stores the offset (-1, 0 or +1) to the cell it was reached from in a signed byte array, and only the totals of the previous row
+            and the current row are kept. Once the last row is reached, the location of sections is rebuilt in one backward pass by following
+            the offsets up from the cell with the minimum total occupancy. When the location of sections isn't needed, no offsets are stored at all.
+            The rows are pushed one at a time through a SectionSelector, which does the bookkeeping described above.
+            Ties are broken by the rank of each list of locations amongst its row, like in select_sections_vectorised, which gives the same
+            result as comparing the lists themselves.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            prob: a list of lists where each list represents different rows of sections
+            path: a boolean indicating whether the location of sections is needed, if not None is returned in its place
+
+        Output:
+            A list containing the minimum total occupancy for the selected sections to be removed and a list of tuples in the form of (i, j)
+            where each tuple represents the location of one section selected for removal
+
+        Time complexity: O(nm) where n is the number of rows and m is the number of columns/aisles
+        Aux space complexity: O(nm) bytes where n is the number of rows and m is the number of columns/aisles, O(m) if path is False
+    '''
+    # Push every row through a selector that keeps parent offsets only if needed
+    selector = SectionSelector(path=path)
+    for row in prob:
+        selector.push(row)
+    return [selector.total(), selector.path()]
+
+class SectionSelector:
+    '''
+    A class representing an incremental selector of sections, which receives the rows of sections one at a time
+
+    Author: Ooi Yu Zhang
+    '''
+    def __init__(self, path=True, spill=None) -> None:
+        '''
+        Constructor for the SectionSelector class
+
+        Input:
+            path: a boolean indicating whether parent offsets are kept so that the location of sections can be rebuilt
+            spill: a file name to write the parent offsets to instead of memory, which is memory-mapped when the location of sections is rebuilt, else None.
+                   The file is created, and an existing file is never overwritten (FileExistsError)
+        '''
+        self.keep_path = path
+        # Number of rows received so far
+        self.rows = 0
+        # Totals and ranks of the last row received
+        self.totals = None
+        self.ranks = None
+        # Offset from every section to the section chosen in the row above, one signed byte each
+        self.offsets = array("b")
+        # File the offsets are spilled to, if any
+        self.spill = open(spill, "x+b") if spill and path else None
+        # Location of sections for the current rows, rebuilt lazily
+        self.sections_location = None
+        # Whether the spill file has been closed
+        self.closed = False
+
+    def __len__(self) -> int:
+        '''
+        Returns the number of rows received so far
+        '''
+        return self.rows
+
+    def push(self, row) -> None:
+        '''
+        Function description:
+            This function adds the next row of sections to the selector.
+
+        Approach description:
+            The totals and ranks of the new row are computed from those of the previous row using select_row, after which the previous row is
+            discarded. Only the parent offsets of the new row are kept, either in memory or appended to the spill file.
+
+        Input:
+            row: a list of integers representing the next row of sections
+
+        Time complexity: O(m) where m is the number of columns/aisles
+        Aux space complexity: O(m) where m is the number of columns/aisles
+        '''
+        if self.closed:
+            raise ValueError("Cannot push rows after the spill file is closed")
+        # Base case, a row of 0s where every list of locations is empty (and therefore equal)
+        if self.totals is None:
+            self.totals = [0] * len(row)
+            self.ranks = [0] * len(row)
+        elif len(row) != len(self.totals):
+            raise ValueError("Expected a row of " + str(len(self.totals)) + " sections, got " + str(len(row)))
+
+        self.totals, self.ranks, offset = select_row(self.totals, self.ranks, row)
+        if self.spill:
+            self.spill.write(array("b", offset).tobytes())
+        elif self.keep_path:
+            self.offsets.extend(offset)
+        self.rows += 1
+
+        # Location of sections has to be rebuilt for the new row
+        self.sections_location = None
+
+    def best(self) -> int:
+        '''
+        Returns the column of the section with the minimum total occupancy in the last row, smallest rank otherwise
+        '''
+        return min(range(len(self.totals)), key=lambda m: (self.totals[m], self.ranks[m]))
+
+    def total(self):
+        '''
+        Returns the minimum total occupancy of the rows received so far, else None
+        '''
+        if not self.rows:
+            return None
+        return self.totals[self.best()]
+
+    def path(self):
+        '''
+        Function description:
+            This function returns the location of sections for removal for the rows received so far.
+
+        Approach description:
+            The location of sections is rebuilt in one backward pass by following the parent offsets up from the section with the minimum
+            total occupancy in the last row. The result is kept until the next row is pushed. If the offsets were spilled to a file, the file
+            is memory-mapped and read in place.
+
+        Output:
+            sections_location: a list of tuples in the form of (i, j) where each tuple represents the location of one section selected for removal,
+                               else None if no rows were received or parent offsets are not kept
+
+        Time complexity: O(n) where n is the number of rows
+        Aux space complexity: O(n) where n is the number of rows
+        '''
+        if not self.rows or not self.keep_path:
+            return None
+        if self.sections_location is not None:
+            return self.sections_location
+
+        columns = len(self.totals)
+        if self.spill:
+            self.spill.flush()
+            mapping = mmap.mmap(self.spill.fileno(), 0, access=mmap.ACCESS_READ)
+            offsets = memoryview(mapping).cast("b")
+        else:
+            offsets = self.offsets
+
+        # Backtrack through the offsets to obtain the location of sections for removal
+        j = self.best()
+        sections_location = [None] * self.rows
+        for n in range(self.rows - 1, -1, -1):
+            sections_location[n] = (n, j)
+            j += offsets[n * columns + j]
+
+        if self.spill:
+            offsets.release()
+            mapping.close()
+
+        self.sections_location = sections_location
+        return sections_location
+
+    def result(self):
+        '''
+        Returns the minimum total occupancy and the location of sections for removal in the same form as select_sections
+        '''
+        return [self.total(), self.path()]
+
+    def close(self) -> None:
+        '''
+        Closes the spill file, if any, after rebuilding the location of sections one last time
+        '''
+        if self.spill:
+            self.path()
+            self.spill.close()
+            self.spill = None
+            self.closed = True
+
+    def __enter__(self):
+        '''
+        Returns the selector, so that the spill file is closed at the end of a with statement
+        '''
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        '''
+        Closes the spill file, if any, see close
+        '''
+        self.close()
+
+class SectionSolver:
+    '''
+    A class representing a persistent solver of select_sections, which keeps its dynamic programming table so that it can be updated
+    when a few sections change
+
+    Author: Ooi Yu Zhang
+    '''
+    def __init__(self, prob) -> None:
+        '''
+        Constructor for the SectionSolver class, which solves the grid once
+
+        Input:
+            prob: a list of lists where each list represents different rows of sections
+
+        Time complexity: O(nm) where n is the number of rows and m is the number of columns/aisles
+        Aux space complexity: O(nm) where n is the number of rows and m is the number of columns/aisles
+        '''
+        # Copy of the grid, so that updates don't change the caller's lists
+        self.prob = [list(row) for row in prob]
+        columns = len(self.prob[0])
+        # Base case, a row of 0s where every list of locations is empty (and therefore equal)
+        self.base_total = [0] * columns
+        self.base_rank = [0] * columns
+        # Totals, ranks and parent offsets of every row of the dynamic programming table
+        self.totals = []
+        self.ranks = []
+        self.offsets = []
+        total, rank = self.base_total, self.base_rank
+        for row in self.prob:
+            total, rank, offset = select_row(total, rank, row)
+            self.totals.append(total)
+            self.ranks.append(rank)
+            self.offsets.append(offset)
+
+    def update(self, i, j, value) -> int:
+        '''
+        Function description:
+            This function changes the occupancy of section (i, j) and updates the dynamic programming table accordingly.
+
+        Approach description:
+            Only rows i and below can change. In row i only column j needs to be recomputed, and in every row after that only the columns
+            diagonal or vertical to a column whose total or rank changed in the row above. The ranks of a row only need to be recomputed if
+            a parent offset changed in that row or a rank changed in the row above. As soon as a row comes out unchanged, the rows below it
+            are unchanged too, so the update stops early.
+
+        Input:
+            i: an integer representing the row of the section
+            j: an integer representing the column of the section
+            value: an integer representing the new occupancy of the section
+
+        Output:
+            n - i: an integer representing the number of rows recomputed
+
+        Time complexity: O((n-i)m) where n is the number of rows and m is the number of columns/aisles, much less if the change dies out early
+        Aux space complexity: O(m) where m is the number of columns/aisles
+        '''
+        self.prob[i][j] = value
+        columns = len(self.prob[0])
+        dirty = {j}
+        rank_changed = False
+
+        n = i
+        while n < len(self.prob) and dirty:
+            previous_total = self.totals[n-1] if n else self.base_total
+            previous_rank = self.ranks[n-1] if n else self.base_rank
+            total = self.totals[n]
+            offset = self.offsets[n]
+
+            # Recompute only the dirty columns of the current row
+            changed = set()
+            offset_changed = False
+            for m in dirty:
+                best = select_parent(previous_total, previous_rank, m)
+                new_total = previous_total[best] + self.prob[n][m]
+                if new_total != total[m]:
+                    total[m] = new_total
+                    changed.add(m)
+                if best - m != offset[m]:
+                    offset[m] = best - m
+                    offset_changed = True
+
+            # Recompute the ranks of the current row if the lists of locations may have been reordered
+            if offset_changed or rank_changed:
+                rank = rank_row(previous_rank, offset)
+                rank_changed = False
+                for m in range(columns):
+                    if rank[m] != self.ranks[n][m]:
+                        rank_changed = True
+                        changed.add(m)
+                self.ranks[n] = rank
+
+            # Columns of the next row reached from a changed column
+            dirty = set()
+            for m in changed:
+                dirty.update(range(max(m - 1, 0), min(m + 2, columns)))
+            n += 1
+
+        return n - i
+
+    def result(self):
+        '''
+        Returns the minimum total occupancy and the location of sections for removal in the same form as select_sections
+        '''
+        total = self.totals[-1]
+        rank = self.ranks[-1]
+        # Obtain minimum total occupancy from last row, smallest rank otherwise
+        j = min(range(len(total)), key=lambda m: (total[m], rank[m]))
+        minimum_total_occupancy = total[j]
+
+        # Backtrack through the offsets to obtain the location of sections for removal
+        sections_location = [None] * len(self.prob)
+        for n in range(len(self.prob) - 1, -1, -1):
+            sections_location[n] = (n, j)
+            j += self.offsets[n][j]
+
+        return [minimum_total_occupancy, sections_location]
+
+def select_sections_vectorised(prob, path=True):
+    '''
+        Function description:
+            This function returns the same result as select_sections, but computes every row of the dynamic programming table as a whole
+            NumPy array instead of cell by cell, which is much faster on large grids.
+
+        Approach descriptions:
+            For every row, the totals of the previous row are shifted left and right so that the left, center and right candidates of every
+            cell line up, and np.minimum combines them into the smallest total reaching each cell. Instead of copying the list of locations into
+            every cell, only the offset (-1, 0 or +1) to the chosen cell in the row above is stored, and the locations are rebuilt in a single
+            backward pass at the end.
+            select_sections compares [total, locations] lists, so when two totals are equal the list of locations that is lexicographically
+            smaller wins. To break ties the same way, every cell also keeps the rank of its list of locations amongst the row. A list of locations
+            is the list of its parent cell with one more location appended, so the ranks of a row are obtained by a stable sort of the cells on
+            the rank of their parent cell. Ties between candidates are then broken by the smaller rank.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            prob: a list of lists (or a 2-D array) where each list represents different rows of sections
+            path: a boolean indicating whether the location of sections is needed, if not None is returned in its place
+
+        Output:
+            A list containing the minimum total occupancy for the selected sections to be removed and a list of tuples in the form of (i, j)
+            where each tuple represents the location of one section selected for removal
+
+        Time complexity: O(nm log m) where n is the number of rows and m is the number of columns/aisles
+        Aux space complexity: O(nm) where n is the number of rows and m is the number of columns/aisles, with only one byte per section
+                              O(m) if path is False
+    '''
+    if np is None:
+        raise ImportError("select_sections_vectorised requires numpy")
+
+    # Solve the grid as a batch of one
+    return select_batch(np.asarray(prob)[np.newaxis], path)[0]
+
+def select_batch(probs, path=True):
+    '''
+    Computes the result of select_sections for every grid of a 3-D array of shape (batch, rows, columns), one row of every grid at a time
+    '''
+    probs = np.asarray(probs)
+    batch, rows, columns = probs.shape
+    batch_index = np.arange(batch)
+    column_index = np.arange(columns)
+
+    # Totals and ranks of the previous row, the base case is a row of 0s where every list of locations is empty (and therefore equal).
+    # Totals are added up in at least 64 bits, as narrow grids such as uint8 would overflow
+    total = np.zeros((batch, columns), dtype=np.result_type(probs.dtype, np.int64))
+    rank = np.zeros((batch, columns), dtype=np.intp)
+
+    # Offset from every section to the section chosen in the row above
+    offsets = np.empty((rows if path else 0, batch, columns), dtype=np.int8)
+
+    for n in range(rows):
+        # Candidates in the order center, left, right. Missing neighbours at the edges copy the center candidate, which wins the tie
+        total_left = np.concatenate((total[:, :1], total[:, :-1]), axis=1)
+        total_right = np.concatenate((total[:, 1:], total[:, -1:]), axis=1)
+        rank_left = np.concatenate((rank[:, :1], rank[:, :-1]), axis=1)
+        rank_right = np.concatenate((rank[:, 1:], rank[:, -1:]), axis=1)
+
+        # Compute smallest total occupancy between values above current total occupancy
+        include = np.minimum(total, np.minimum(total_left, total_right))
+
+        # Amongst the candidates with the smallest total, choose the one with the smallest rank
+        largest_rank = columns
+        candidate_ranks = np.stack((
+            np.where(total == include, rank, largest_rank),
+            np.where(total_left == include, rank_left, largest_rank),
+            np.where(total_right == include, rank_right, largest_rank),
+        ))
+        choice = np.argmin(candidate_ranks, axis=0)
+        offset = np.array([0, -1, 1], dtype=np.int8)[choice]
+        if path:
+            offsets[n] = offset
+
+        # Rank the lists of locations of the current row by the rank of their parent, then by their column
+        order = np.argsort(np.take_along_axis(rank, column_index + offset, axis=1), axis=1, kind="stable")
+        rank = np.empty((batch, columns), dtype=np.intp)
+        np.put_along_axis(rank, order, column_index[np.newaxis], axis=1)
+
+        # Update current total occupancy with smallest total occupancy computed
+        total = include + probs[:, n]
+
+    # Obtain minimum total occupancy from last row of every grid, smallest rank otherwise
+    j = np.argmin(np.where(total == total.min(axis=1, keepdims=True), rank, columns), axis=1)
+    minimum_total_occupancy = total[batch_index, j].tolist()
+    if not path:
+        return [[minimum_total_occupancy[b], None] for b in range(batch)]
+
+    # Backtrack through the offsets of every grid at once to obtain the columns of sections for removal
+    sections_column = np.empty((rows, batch), dtype=np.intp)
+    for n in range(rows - 1, -1, -1):
+        sections_column[n] = j
+        j = j + offsets[n, batch_index, j]
+
+    sections_column = sections_column.T.tolist()
+    return [[minimum_total_occupancy[b], list(zip(range(rows), sections_column[b]))] for b in range(batch)]
+
+def select_sections_batch(probs, path=True, workers=None, chunk_size=1024):
+    '''
+        Function description:
+            This function returns the result of select_sections for every grid in a batch of same-shaped grids.
+
+        Approach descriptions:
+            Calling select_sections once per grid spends most of its time on per-call overhead when the grids are small. Instead, the grids are
+            stacked into a 3-D array of shape (batch, rows, columns) and the dynamic programming of select_sections_vectorised is run on one row of
+            every grid at a time, so each NumPy operation covers the whole batch. For very large batches, the batch can be split into chunks that
+            are solved by a pool of worker processes.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            probs: a list of grids (or a 3-D array) where every grid is a list of lists representing different rows of sections
+            path: a boolean indicating whether the location of sections is needed, if not None is returned in its place
+            workers: an integer representing the number of worker processes to solve the chunks with, else None to solve in this process
+            chunk_size: an integer representing the number of grids given to a worker process at a time
+
+        Output:
+            A list containing the result of select_sections for every grid, in the same order as probs
+
+        Time complexity: O(bnm log m) where b is the number of grids, n is the number of rows and m is the number of columns/aisles
+        Aux space complexity: O(bnm) where b is the number of grids, n is the number of rows and m is the number of columns/aisles,
+                              O(bm) if path is False
+    '''
+    if np is None:
+        raise ImportError("select_sections_batch requires numpy")
+
+    probs = np.asarray(probs)
+    if probs.ndim != 3:
+        raise ValueError("Expected a 3-D array of shape (batch, rows, columns)")
+    if not workers or len(probs) <= chunk_size:
+        return select_batch(probs, path)
+
+    # Split the batch into chunks and solve them in a pool of worker processes
+    chunks = [probs[i:i + chunk_size] for i in range(0, len(probs), chunk_size)]
+    res = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for chunk_res in executor.map(select_batch, chunks, [path] * len(chunks)):
+            res.extend(chunk_res)
+    return res
+
+def select_sections_window(prob, window=1, blocked=None, path=True):
+    '''
+        Function description:
+            This function returns the same kind of result as select_sections, but allows moving up to window columns to the left or right
+            between consecutive rows, and never selects the sections in blocked.
+
+        Approach descriptions:
+            Checking every section within the window for every section would take O(nmw) time. Instead, the smallest (total, rank) within the
+            window is maintained as the window slides along the previous row using a monotonic deque: a column is pushed at the back once it enters
+            the window after popping all columns with a larger (total, rank) from the back, and popped from the front once it leaves the window,
+            so the front of the deque is always the best section within the window and every column is pushed and popped at most once per row.
+            Blocked sections are given an infinite occupancy, so no finite total goes through them. Like select_sections_parents, only two
+            rows of totals and ranks are kept along with the parent offsets.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            prob: a list of lists where each list represents different rows of sections
+            window: an integer representing the maximum number of columns moved between consecutive rows, 1 for the same moves as select_sections
+            blocked: a collection of tuples in the form of (i, j) representing sections that cannot be selected, else None
+            path: a boolean indicating whether the location of sections is needed, if not None is returned in its place
+
+        Output:
+            A list containing the minimum total occupancy for the selected sections to be removed and a list of tuples in the form of (i, j)
+            where each tuple represents the location of one section selected for removal, else None if every selection includes a blocked section
+
+        Time complexity: O(nm) where n is the number of rows and m is the number of columns/aisles, for any window
+        Aux space complexity: O(nm) where n is the number of rows and m is the number of columns/aisles, O(m) if path is False
+    '''
+    if window < 0:
+        raise ValueError("window must not be negative")
+    blocked = set(blocked) if blocked else set()
+    columns = len(prob[0])
+
+    # Base case, a row of 0s where every list of locations is empty (and therefore equal)
+    total = [0] * columns
+    rank = [0] * columns
+
+    # Offset from every section to the section chosen in the row above, which no longer fits in a signed byte for wide windows
+    offsets = array("b" if window < 128 else "l")
+
+    for n in range(len(prob)):
+        new_total = [0] * columns
+        offset = [0] * columns
+        # Columns of the previous row in the window, in increasing order of (total, rank) from the front
+        candidates = deque()
+        right = 0
+        for m in range(columns):
+            # Slide the right end of the window
+            while right < columns and right <= m + window:
+                while candidates and (total[candidates[-1]], rank[candidates[-1]]) >= (total[right], rank[right]):
+                    candidates.pop()
+                candidates.append(right)
+                right += 1
+            # Slide the left end of the window
+            while candidates[0] < m - window:
+                candidates.popleft()
+
+            best = candidates[0]
+            new_total[m] = total[best] + (inf if (n, m) in blocked else prob[n][m])
+            offset[m] = best - m
+
+        rank = rank_row(rank, offset)
+        total = new_total
+        if path:
+            offsets.extend(offset)
+
+    # Obtain minimum total occupancy from last row, smallest rank otherwise
+    j = min(range(columns), key=lambda m: (total[m], rank[m]))
+    minimum_total_occupancy = total[j]
+    if minimum_total_occupancy == inf:
+        return None
+    if not path:
+        return [minimum_total_occupancy, None]
+
+    # Backtrack through the offsets to obtain the location of sections for removal
+    sections_location = [None] * len(prob)
+    for n in range(len(prob) - 1, -1, -1):
+        sections_location[n] = (n, j)
+        j += offsets[n * columns + j]
+
+    return [minimum_total_occupancy, sections_location]
+
+def select_sections_topk(prob, k):
+    '''
+        Function description:
+            This function returns up to k distinct selections of sections for removal with the lowest total occupancy, in increasing order of total
+            occupancy. The first selection is the same as the result of select_sections.
+
+        Approach descriptions:
+            Instead of keeping only the smallest total in every cell, every cell keeps a sorted list of up to k candidates, each made of a total,
+            the rank of its list of locations amongst the row (see select_sections_vectorised) and a pointer to the candidate in the row above it
+            extends. The candidates of a cell are obtained by merging the sorted lists of the cells diagonal or vertical to it with a heap and
+            keeping the first k. As every candidate extends a different candidate from the row above or ends in a different cell, all candidates
+            are distinct lists of locations. Finally, the lists of the last row are merged once more and the k best are rebuilt by following
+            the pointers back up.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            prob: a list of lists where each list represents different rows of sections
+            k: an integer representing the number of selections to return
+
+        Output:
+            A list of up to k lists in the same form as the output of select_sections, sorted by total occupancy, then by location of sections
+
+        Time complexity: O(nmk log k) where n is the number of rows, m is the number of columns/aisles and k is the number of selections
+        Aux space complexity: O(nmk) where n is the number of rows, m is the number of columns/aisles and k is the number of selections
+    '''
+    if k < 1:
+        return []
+    rows = len(prob)
+    columns = len(prob[0])
+
+    # Candidates of every section in the previous row as sorted lists of (total, rank), only one per section in the first row
+    candidates = [[(0 + prob[0][m], m)] for m in range(columns)]
+    # Pointers from every candidate to the (column, index) of the candidate it extends in the row above
+    pointers = [[[None] for m in range(columns)]]
+
+    for n in range(1, rows):
+        new_candidates = [None] * columns
+        new_pointers = [None] * columns
+        # Candidates grouped by the rank of the candidate they extend
+        buckets = [[] for i in range(sum(len(c) for c in candidates))]
+        for m in range(columns):
+            # Merge the sorted candidates diagonal or vertical to the current section, keeping the k smallest
+            merged = heapq.merge(*[[(total, rank, p, i) for i, (total, rank) in enumerate(candidates[p])]
+                                   for p in range(max(m - 1, 0), min(m + 2, columns))])
+            best = list(islice(merged, k))
+            new_candidates[m] = [total + prob[n][m] for total, rank, p, i in best]
+            new_pointers[m] = [(p, i) for total, rank, p, i in best]
+            for i in range(len(best)):
+                buckets[best[i][1]].append((m, i))
+
+        # Rank the candidates by the rank of the candidate they extend, then by their column
+        ranks = [[0] * len(c) for c in new_candidates]
+        r = 0
+        for bucket in buckets:
+            for m, i in bucket:
+                ranks[m][i] = r
+                r += 1
+        candidates = [list(zip(new_candidates[m], ranks[m])) for m in range(columns)]
+        pointers.append(new_pointers)
+
+    # Obtain the k smallest candidates from the last row
+    best = islice(heapq.merge(*[[(total, rank, m, i) for i, (total, rank) in enumerate(candidates[m])] for m in range(columns)]), k)
+
+    res = []
+    for total, rank, j, i in best:
+        # Backtrack through the pointers to obtain the location of sections for removal
+        sections_location = [None] * rows
+        for n in range(rows - 1, -1, -1):
+            sections_location[n] = (n, j)
+            if n:
+                j, i = pointers[n][j][i]
+        res.append([total, sections_location])
+    return res
+
 ##############################
 ########### Tests ############
 ##############################
@@ -123,6 +798,113 @@ def test_selectsections_1():
     res = select_sections(occupancy_probability)
     return res == expected
 
+def test_selectsections_parents():
+    occupancy_probability = [[1, 0, 1],
+                             [0, 1, 0],
+                             [1, 0, 1]]
+    expected = [0, [(0, 1), (1, 0), (2, 1)]]
+    res = select_sections(occupancy_probability, engine="parents")
+    total = select_sections(occupancy_probability, engine="parents", path=False)
+    return res == expected and total == [0, None]
+
+def test_sectionselector():
+    occupancy_probability = [[19, 76, 38, 22],
+                             [56, 20, 54, 68],
+                             [71, 86, 15, 99],
+                             [81, 82, 82, 22],
+                             [36, 22, 22, 93]]
+    selector = SectionSelector()
+    # Partial results must match select_sections on the rows received so far
+    for i in range(len(occupancy_probability)):
+        selector.push(occupancy_probability[i])
+        if selector.result() != select_sections(occupancy_probability[:i+1]):
+            return False
+    res_1 = selector.result() == [98, [(0, 0), (1, 1), (2, 2), (3, 3), (4, 2)]]
+
+    # Spilling the parent offsets to a file gives the same results, and the result stays available once the file is closed
+    import os
+    import tempfile
+    with tempfile.TemporaryDirectory() as directory:
+        spill = os.path.join(directory, "offsets.bin")
+        with SectionSelector(spill=spill) as selector:
+            for i in range(len(occupancy_probability)):
+                selector.push(occupancy_probability[i])
+                if selector.result() != select_sections(occupancy_probability[:i+1]):
+                    return False
+        res_2 = selector.spill is None and selector.result() == [98, [(0, 0), (1, 1), (2, 2), (3, 3), (4, 2)]]
+        # An existing file is never overwritten
+        try:
+            SectionSelector(spill=spill)
+            res_3 = False
+        except FileExistsError:
+            res_3 = True
+    return res_1 and res_2 and res_3
+
+def test_selectsections_batch():
+    # select_sections_batch requires numpy, which is optional
+    if np is None:
+        return True
+    occupancy_probability = [[[19, 76, 38, 22, 0],
+                              [56, 20, 54, 0, 34],
+                              [71, 86, 0, 99, 89],
+                              [81, 0, 82, 22, 45],
+                              [0, 22, 22, 93, 23]],
+                             [[19, 76, 38, 22, 0],
+                              [56, 20, 54, 0, 34],
+                              [71, 86, 0, 99, 89],
+                              [81, 34, 82, 0, 45],
+                              [62, 22, 22, 93, 0]]]
+    expected = [[0, [(0, 4), (1, 3), (2, 2), (3, 1), (4, 0)]],
+                [0, [(0, 4), (1, 3), (2, 2), (3, 3), (4, 4)]]]
+    res_1 = select_sections_batch(occupancy_probability) == expected
+    # A uint8 grid whose total goes past 255 must not overflow
+    tall = [[200, 255, 200]] * 4
+    res_2 = select_sections_batch(np.array([tall], dtype=np.uint8)) == [[800, [(0, 0), (1, 0), (2, 0), (3, 0)]]]
+    return res_1 and res_2
+
+def test_selectsections_topk():
+    occupancy_probability = [[32, 86, 95, 15, 68, 90],
+                             [91, 88, 96, 51, 64, 66],
+                             [17, 70, 13,  9, 90, 17],
+                             [17, 15, 38, 12, 53, 17],
+                             [29,  6, 18, 27, 66, 48],
+                             [74, 43, 76, 44,  3,  1],
+                             [89,  1,  8, 24, 45, 62],
+                             [ 3, 98, 99, 89,  6, 66]]
+    # Both paths of total 147 must be returned, lexicographically smaller first
+    expected = [[147, [(0, 3), (1, 3), (2, 2), (3, 1), (4, 1), (5, 1), (6, 1), (7, 0)]],
+                [147, [(0, 3), (1, 3), (2, 3), (3, 3), (4, 3), (5, 4), (6, 3), (7, 4)]]]
+    res = select_sections_topk(occupancy_probability, 3)
+    return res[:2] == expected and res[2][0] > 147 and res[0] == select_sections(occupancy_probability)
+
+def test_sectionsolver():
+    occupancy_probability = [[19, 76, 38, 22, 0],
+                             [56, 20, 54, 0, 34],
+                             [71, 86, 0, 99, 89],
+                             [81, 34, 82, 0, 45],
+                             [62, 22, 22, 93, 0]]
+    solver = SectionSolver(occupancy_probability)
+    # Blocking the last section of the path moves it to the other 0 in the row above
+    solver.update(4, 4, 100)
+    occupancy_probability[4][4] = 100
+    res_1 = solver.result() == select_sections(occupancy_probability)
+    # Changing (0, 1) changes the totals of row 0, but row 1 comes out unchanged, so only 2 rows are recomputed
+    rows = solver.update(0, 1, 77)
+    occupancy_probability[0][1] = 77
+    res_2 = solver.result() == select_sections(occupancy_probability)
+    return res_1 and res_2 and rows == 2
+
+def test_selectsections_window():
+    occupancy_probability = [[0, 50, 50, 50, 50],
+                             [50, 50, 50, 50, 0],
+                             [0, 50, 50, 50, 50]]
+    # A window of 1 matches select_sections, a window of 4 reaches every 0
+    res_1 = select_sections_window(occupancy_probability) == select_sections(occupancy_probability)
+    res_2 = select_sections_window(occupancy_probability, window=4) == [0, [(0, 0), (1, 4), (2, 0)]]
+    # Blocking the middle 0 makes the wide window settle for 50
+    res_3 = select_sections_window(occupancy_probability, window=4, blocked=[(1, 4)]) == [50, [(0, 0), (1, 0), (2, 0)]]
+    return res_1 and res_2 and res_3
+
 def test_selectsections_2():
     occupancy_probability = [[15],[84],[82],[79],[77],[55],[69],[13],[21],[33],[85],[100],[67],[93],[3],[26],[29],[89],[36],[100],[68],[34],[87],[55],[47],[44],[64],[84],[41],[97]]
     expected = [1777, [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (5, 0), (6, 0), (7, 0), (8, 0), (9, 0), (10, 0), (11, 0), (12, 0), (13, 0), (14, 0), (15, 0), (16, 0), (17, 0), (18, 0), (19, 0), (20, 0), (21, 0), (22, 0), (23, 0), (24, 0), (25, 0), (26, 0), (27, 0), (28, 0), (29, 0)]]
@@ -149,6 +931,25 @@ def test_selectsections_4():
     res = select_sections(occupancy_probability)
     return res == expected_1 or res == expected_2
 
+def test_selectsections_vectorised():
+    occupancy_probability = [[32, 86, 95, 15, 68, 90],
+                             [91, 88, 96, 51, 64, 66],
+                             [17, 70, 13,  9, 90, 17],
+                             [17, 15, 38, 12, 53, 17],
+                             [29,  6, 18, 27, 66, 48],
+                             [74, 43, 76, 44,  3,  1],
+                             [89,  1,  8, 24, 45, 62],
+                             [ 3, 98, 99, 89,  6, 66]]
+    # Both engines must break the tie between the two paths of total 147 the same way
+    # The "numpy" engine requires numpy, which is optional
+    if np is None:
+        return True
+    expected = select_sections(occupancy_probability)
+    res_1 = select_sections(occupancy_probability, engine="numpy") == expected
+    # Totals of a uint8 grid go past 255 without overflowing
+    res_2 = select_sections(np.array(occupancy_probability, dtype=np.uint8), engine="numpy") == expected
+    return res_1 and res_2
+
 
 
 #######################################################################
@@ -160,5 +961,12 @@ def test_selectsections_4():
 #print(test_selectsections_2())
 #print(test_selectsections_3())
 #print(test_selectsections_4())
+#print(test_selectsections_vectorised())
+#print(test_selectsections_parents())
+#print(test_sectionselector())
+#print(test_selectsections_batch())
+#print(test_selectsections_topk())
+#print(test_sectionsolver())
+#print(test_selectsections_window())
 
 #######################################################################
@@ -1,7 +1,10 @@
 #####################
 ###### Imports ######
 #####################
+from array import array
+from collections import deque
 from math import inf
+import sys
 
 class Edge:
     '''
@@ -13,7 +16,12 @@ class Edge:
         '''
         self.a = a
         self.b = b
+        # Residual capacity of the Edge
         self.c = c
+        # Capacity of the Edge before any flow, 0 for a reverse Edge
+        self.capacity = c
+        # Edge in the opposite direction that flow sent along this Edge can be sent back along
+        self.reverse = None
 
     def __str__(self) -> None:
         '''
@@ -34,9 +42,6 @@ class Vertex:
         self.id = id
         # List of Edges connected to this Vertex
         self.edges = []
-        # Variables used for traversing
-        self.discovered = False
-        self.visited = False
         # The previous Vertex of this Vertex for shortest time
         self.previous = None
         # Flow to previous Vertex
@@ -96,7 +101,8 @@ class FlowNetwork:
         # Initialise single sink
         self.vertices[len(self.vertices) - 1] = Vertex(len(self.vertices) - 1)
 
-        # Initialise edges in the graph
+        # Initialise edges in the graph, every channel then every edge inside of a vertex, without their reverse Edges
+        self.edges = []
         self.add_edges(edges, self.vertices_count, maxIn, maxOut)
 
         # Initialise origin
@@ -111,6 +117,17 @@ class FlowNetwork:
             res = res + "Vertex " + str(v) + "\n"
         return res
 
+    def add_edge(self, edge) -> None:
+        '''
+        Adds an edge onto the flow network, along with its reverse Edge with no capacity
+        '''
+        reverse = Edge(edge.b, edge.a, 0)
+        edge.reverse = reverse
+        reverse.reverse = edge
+        self.vertices[edge.a].add_edge(edge)
+        self.vertices[edge.b].add_edge(reverse)
+        self.edges.append(edge)
+
     def add_edges(self, edges, vertices_count, maxIn, maxOut) -> None:
         '''
         Adds all given edges onto the flow network
@@ -122,8 +139,7 @@ class FlowNetwork:
             w = edges[i][2]
             # Max capacity is minimum among channel, max incoming and max outgoing
             current_edge = Edge(u + self.vertices_count + 1, v, min(w, min(maxOut[u], maxIn[v])))
-            current_vertex = self.vertices[u + self.vertices_count + 1]
-            current_vertex.add_edge(current_edge)
+            self.add_edge(current_edge)
 
         # Adding edges from vertices to their counterparts to emulate capacity inside of vertex
         for i in range(self.vertices_count + 1):
@@ -133,19 +149,16 @@ class FlowNetwork:
                 # If vertex is a target
                 if self.vertices[i].target:
                     # Adding edges from targets to their counterparts to emulate capacity inside of vertex
-                    current_vertex = self.vertices[i]
                     current_edge = Edge(i, i + self.vertices_count + 1, maxIn[i])
-                    current_vertex.add_edge(current_edge)
+                    self.add_edge(current_edge)
 
                     # Adding edges from targets to an end node for combined capacity
-                    current_vertex = self.vertices[i + self.vertices_count + 1]
                     current_edge = Edge(i + self.vertices_count + 1, len(self.vertices) - 1, maxIn[i])
-                    current_vertex.add_edge(current_edge)
+                    self.add_edge(current_edge)
                 else:
                     # Adding edges from normal vertices to their counterparts
-                    current_vertex = self.vertices[i]
                     current_edge = Edge(i, i + self.vertices_count + 1, maxOut[i])
-                    current_vertex.add_edge(current_edge)
+                    self.add_edge(current_edge)
 
     def ford_fulkerson(self) -> int:
         '''
@@ -160,7 +173,8 @@ class FlowNetwork:
             values to obtain the maximum throughput. The function continuously runs a BFS algorithm, which will run until there are no paths from
             the origin to the end node. Meanwhile, as long as the BFS is still running, the function will find the minimum throughput for every path
             and update the residual network accordingly, until there are no paths anymore, after which we will have a min cut in our flow network,
-            giving us our maximum throughput.
+            giving us our maximum throughput. Every edge has a reverse Edge in the residual network holding the flow sent along it, so that a
+            later path can send flow back and undo an early choice of path that blocks the maximum throughput.
 
         Author: Ooi Yu Zhang
 
@@ -190,15 +204,119 @@ class FlowNetwork:
             min_flow = min(path)
             flow += min_flow
 
-            # Update residual network
+            # Update residual network, the flow can be sent back along the reverse Edges later
             current = self.vertices[-1]
             while current.id != self.origin:
                 edge = current.previous
                 edge.c -= min_flow
+                edge.reverse.c += min_flow
                 current = self.vertices[current.previous.a]
 
         return flow
 
+    def residual_arcs(self):
+        '''
+        Returns the residual network in compressed sparse row form, see residual_arrays, along with the forward arc of every Edge in
+        self.edges
+        '''
+        return residual_arrays(len(self.vertices), [edge.a for edge in self.edges], [edge.b for edge in self.edges],
+                               [edge.c for edge in self.edges], [edge.reverse.c for edge in self.edges])
+
+    def update_residual(self, capacities, reverse, arcs) -> None:
+        '''
+        Sets the residual capacity of every Edge from the residual capacities of the arcs from residual_arcs
+        '''
+        for k in range(len(self.edges)):
+            self.edges[k].c = capacities[arcs[k]]
+            self.edges[k].reverse.c = capacities[reverse[arcs[k]]]
+
+    def tail(self, k) -> int:
+        '''
+        Returns the vertex that edge k of self.edges leaves
+        '''
+        return self.edges[k].a
+
+    def flows(self) -> list:
+        '''
+        Returns the flow along every edge, in the same order as self.edges
+        '''
+        return [edge.capacity - edge.c for edge in self.edges]
+
+    def min_cut(self) -> list:
+        '''
+        Returns the indices in self.edges of the edges from the vertices that can still be reached from the origin in the residual network
+        to the ones that can't. Once the flow is maximum, these edges are a minimum cut and all of them are saturated
+        '''
+        reached = [False] * len(self.vertices)
+        reached[self.origin] = True
+        queue = deque([self.vertices[self.origin]])
+        while queue:
+            u = queue.popleft()
+            for edge in u.edges:
+                if edge.c and not reached[edge.b]:
+                    reached[edge.b] = True
+                    queue.append(self.vertices[edge.b])
+        return [k for k in range(len(self.edges)) if reached[self.edges[k].a] and not reached[self.edges[k].b]]
+
+    def dinic(self) -> int:
+        '''
+        Function description:
+            This function utilises Dinic's algorithm to compute the maximum possible flow from an origin to a list of specified targets.
+
+        Approach description:
+            The same flow network as ford_fulkerson is used, as flat arrays of arcs (see residual_arrays) with a reverse arc for every edge so
+            that flow sent along an edge can be sent back later. Every phase runs one BFS from the origin to give every vertex its level, the
+            length of its shortest path in the residual network, and then sends a blocking flow along the arcs going from one level to the
+            next only, using a DFS that keeps a pointer to the next arc to try at every vertex. An arc that can't lead to the end node in this
+            phase is never tried again in the phase, so a phase takes O(|D||C|), and as the shortest path to the end node gets longer after
+            every phase, there are at most O(|D|) phases.
+
+        Author: Ooi Yu Zhang
+
+        Output:
+            flow: an integer representing the maximum possible data throughput from the data centre origin to the data centres specified in targets
+
+        Time complexity: O(|D|^2*|C|) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
+        Aux space complexity: O(|D|+|C|) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
+        '''
+        offsets, heads, capacities, reverse, arcs = self.residual_arcs()
+        flow = dinic_arrays(offsets, heads, capacities, reverse, self.origin, len(self.vertices) - 1)
+        self.update_residual(capacities, reverse, arcs)
+        return flow
+
+    def push_relabel(self) -> int:
+        '''
+        Function description:
+            This function utilises the highest-label push-relabel algorithm to compute the maximum possible flow from an origin to a list
+            of specified targets.
+
+        Approach description:
+            The same flow network as ford_fulkerson is used, as flat arrays of arcs (see residual_arrays) with a reverse arc for every edge.
+            Instead of augmenting whole paths, every arc leaving the origin is saturated at once, which leaves an excess of flow at its
+            vertices, and excesses are then pushed along residual arcs towards the end node. Every vertex has a label, a lower bound on its
+            distance to the end node, and flow is only pushed down to a vertex labelled one less, so when a vertex with excess has no such arc
+            left it is relabelled to one more than its lowest neighbour. The vertex with excess and the highest label is always the next one
+            discharged.
+            Two heuristics keep the labels exact: every O(|D|) relabels, a global relabel runs a BFS backwards from the end node to set
+            every label to the exact distance, and when the last vertex with some label is relabelled, no vertex with a higher label can
+            reach the end node anymore (a gap), so all of them are lifted out of the way at once. Vertices labelled |D| or more can't reach
+            the end node, and their excess would only go back to the origin, so they are never discharged: the maximum flow is the excess
+            of the end node once no other vertex can be discharged. Their excess is then pushed back to the origin the same way, so that the
+            flow along every edge is left in the FlowNetwork.
+
+        Author: Ooi Yu Zhang
+
+        Output:
+            flow: an integer representing the maximum possible data throughput from the data centre origin to the data centres specified in targets
+
+        Time complexity: O(|D|^2*sqrt(|C|)) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
+        Aux space complexity: O(|D|+|C|) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
+        '''
+        offsets, heads, capacities, reverse, arcs = self.residual_arcs()
+        flow = push_relabel_arrays(offsets, heads, capacities, reverse, self.origin, len(self.vertices) - 1)
+        self.update_residual(capacities, reverse, arcs)
+        return flow
+
 class ResidualNetwork:
     '''
     A basic class representing Residual Networks
@@ -208,44 +326,686 @@ class ResidualNetwork:
         Constructor for the ResidualNetwork class
         '''
         self.graph = graph
+        # Number of the current search, and the number of the last search that discovered every vertex
+        self.epoch = 0
+        self.discovered = [0] * len(graph.vertices)
 
     def bfs(self, source, sink):
         '''
         Function for Breadth-First Search algorithm
+
+        A vertex is discovered in the current search if its entry in discovered is the number of the current search, so starting a new
+        search only increments that number instead of resetting every vertex, and the previous Edge and flow of a vertex are only read
+        after they are set by the current search. Each search takes O(|D'|+|C'|) where D' and C' are the vertices and edges it reaches
         '''
-        #Reset vertices
-        for u in range(len(self.graph.vertices)):
-            if self.graph.vertices[u]:
-                self.graph.vertices[u].visited = False
-                self.graph.vertices[u].discovered = False
-                self.graph.vertices[u].previous = None
+        self.epoch += 1
+        epoch = self.epoch
+        vertices = self.graph.vertices
+        discovered = self.discovered
 
         res = []
-        discovered = []
-        discovered.append(source)
-        while len(discovered) > 0:
-            u = discovered.pop(0)
+        queue = deque([source])
+        discovered[source.id] = epoch
+        while queue:
+            u = queue.popleft()
 
             # If reached the sink, return path
             if u.id == sink.id:
                 return res
 
-            u.visited = True
             res.append(u)
             for edge in u.edges:
-                v = self.graph.vertices[edge.b]
-                if v.discovered == False and edge.c:
-                    discovered.append(v)
-                    v.discovered = True
+                if edge.c and discovered[edge.b] != epoch:
+                    v = vertices[edge.b]
+                    queue.append(v)
+                    discovered[edge.b] = epoch
                     v.previous = edge
                     v.flow = edge.c
 
         return False
 
-def maxThroughput(connections, maxIn, maxOut, origin, targets) -> int:
+def is_int64(values) -> bool:
+    '''
+    Returns whether every value fits in a 64-bit integer, so that capacities can be stored in an array("q") instead of a list
+    '''
+    return all(isinstance(c, int) and -2 ** 63 <= c < 2 ** 63 for c in values)
+
+def residual_arrays(vertices, tails, heads, capacities, reverse_capacities):
+    '''
+    Function description:
+        This function builds the residual network of a flow network in compressed sparse row form.
+
+    Approach description:
+        Every edge k from tails[k] to heads[k] gives a pair of arcs, a forward arc with the residual capacity capacities[k] and a reverse
+        arc with reverse_capacities[k]. The arcs leaving every vertex are stored next to each other, those of vertex u from offsets[u] up
+        to offsets[u+1], which is found with a counting sort on the vertex every arc leaves. Every arc is then three integers in flat
+        arrays: the vertex it points to, its residual capacity and the index of its reverse arc, instead of an object.
+
+    Author: Ooi Yu Zhang
+
+    Input:
+        vertices: an integer representing the number of vertices
+        tails: a list of integers representing the vertex every edge leaves
+        heads: a list of integers representing the vertex every edge points to
+        capacities: a list of numbers representing the residual capacity of every edge
+        reverse_capacities: a list of numbers representing the residual capacity of the reverse of every edge
+
+    Output:
+        offsets: an array of the start of the arcs leaving every vertex, with the number of arcs at the end
+        arc_heads: an array of the vertex every arc points to
+        arc_capacities: an array of the residual capacity of every arc, or a list if a capacity doesn't fit in a 64-bit integer (such as
+                        a float or infinity)
+        reverse: an array of the index of the reverse of every arc
+        arcs: an array of the index of the forward arc of every edge
+
+    Time complexity: O(|D|+|C|) where D is the number of vertices and C is the number of edges
+    Aux space complexity: O(|D|+|C|) where D is the number of vertices and C is the number of edges
+    '''
+    # Count the arcs leaving every vertex, then turn the counts into the start of every block
+    counts = [0] * (vertices + 1)
+    for k in range(len(tails)):
+        counts[tails[k] + 1] += 1
+        counts[heads[k] + 1] += 1
+    for u in range(vertices):
+        counts[u + 1] += counts[u]
+    offsets = array("q", counts)
+
+    arc_heads = array("i", bytes(4 * counts[-1]))
+    if is_int64(capacities) and is_int64(reverse_capacities):
+        arc_capacities = array("q", bytes(8 * counts[-1]))
+    else:
+        arc_capacities = [0] * counts[-1]
+    reverse = array("i", bytes(4 * counts[-1]))
+    arcs = array("i", bytes(4 * len(tails)))
+    # Next free arc of every vertex
+    position = counts
+    for k in range(len(tails)):
+        a = tails[k]
+        b = heads[k]
+        forward = position[a]
+        position[a] += 1
+        backward = position[b]
+        position[b] += 1
+        arc_heads[forward] = b
+        arc_capacities[forward] = capacities[k]
+        reverse[forward] = backward
+        arc_heads[backward] = a
+        arc_capacities[backward] = reverse_capacities[k]
+        reverse[backward] = forward
+        arcs[k] = forward
+    return offsets, arc_heads, arc_capacities, reverse, arcs
+
+def ford_fulkerson_arrays(offsets, heads, capacities, reverse, source, sink, limit=inf) -> int:
+    '''
+    Returns the maximum flow from source to sink of a residual network from residual_arrays like FlowNetwork.ford_fulkerson, augmenting
+    along the shortest path found by a BFS until there is none or the flow reaches limit, and leaves the flow in capacities. Discovered
+    vertices are stamped with the number of the search like ResidualNetwork.bfs
+    '''
+    # No flow leaves a source that is the sink itself, like FlowNetwork.ford_fulkerson
+    if source == sink:
+        return 0
+    n = len(offsets) - 1
+    discovered = [0] * n
+    # Arc used to discover every vertex
+    previous = [0] * n
+    flow = 0
+    epoch = 0
+    while flow < limit:
+        epoch += 1
+        discovered[source] = epoch
+        queue = deque([source])
+        while queue and discovered[sink] != epoch:
+            u = queue.popleft()
+            for e in range(offsets[u], offsets[u + 1]):
+                if capacities[e]:
+                    v = heads[e]
+                    if discovered[v] != epoch:
+                        discovered[v] = epoch
+                        previous[v] = e
+                        queue.append(v)
+        if discovered[sink] != epoch:
+            return flow
+
+        # Find the minimum residual capacity along the path, then update the residual network
+        min_flow = limit - flow
+        v = sink
+        while v != source:
+            min_flow = min(min_flow, capacities[previous[v]])
+            v = heads[reverse[previous[v]]]
+        v = sink
+        while v != source:
+            e = previous[v]
+            capacities[e] -= min_flow
+            capacities[reverse[e]] += min_flow
+            v = heads[reverse[e]]
+        flow += min_flow
+    return flow
+
+def dinic_arrays(offsets, heads, capacities, reverse, source, sink) -> int:
+    '''
+    Returns the maximum flow from source to sink of a residual network from residual_arrays with Dinic's algorithm, see FlowNetwork.dinic,
+    and leaves the flow in capacities
+    '''
+    # No flow leaves a source that is the sink itself, like FlowNetwork.ford_fulkerson
+    if source == sink:
+        return 0
+    n = len(offsets) - 1
+    flow = 0
+
+    while True:
+        # Level of every vertex in the residual network, -1 if unreachable
+        level = [-1] * n
+        level[source] = 0
+        queue = deque([source])
+        while queue:
+            u = queue.popleft()
+            for e in range(offsets[u], offsets[u + 1]):
+                if capacities[e] and level[heads[e]] < 0:
+                    level[heads[e]] = level[u] + 1
+                    queue.append(heads[e])
+        if level[sink] < 0:
+            return flow
+
+        # Blocking flow, pointer to the next arc to try at every vertex
+        pointer = list(offsets)
+        path = []
+        u = source
+        while True:
+            if u == sink:
+                # Augment along the path by its minimum residual capacity
+                min_flow = min(capacities[e] for e in path)
+                for e in path:
+                    capacities[e] -= min_flow
+                    capacities[reverse[e]] += min_flow
+                flow += min_flow
+                path = []
+                u = source
+                continue
+            end = offsets[u + 1]
+            while pointer[u] < end:
+                e = pointer[u]
+                if capacities[e] and level[heads[e]] == level[u] + 1:
+                    break
+                pointer[u] += 1
+            if pointer[u] < end:
+                # Advance along the arc
+                path.append(e)
+                u = heads[e]
+            elif path:
+                # Dead end, retreat and skip the arc leading here
+                level[u] = -1
+                u = heads[reverse[path.pop()]]
+                pointer[u] += 1
+            else:
+                break
+
+def push_relabel_arrays(offsets, heads, capacities, reverse, source, sink) -> int:
+    '''
+    Returns the maximum flow from source to sink of a residual network from residual_arrays with the highest-label push-relabel algorithm,
+    see FlowNetwork.push_relabel, and leaves the flow in capacities
+    '''
+    n = len(offsets) - 1
+    excess = [0] * n
+    label = [n] * n
+    pointer = list(offsets)
+    # Vertices with excess and a label under n, by label
+    buckets = [[] for i in range(n)]
+    # Number of vertices with every label under n
+    counts = [0] * n
+
+    def global_relabel():
+        '''
+        Sets the label of every vertex to its distance to the sink, n if it can't reach it, and fills the buckets again
+        '''
+        for u in range(n):
+            label[u] = n
+            pointer[u] = offsets[u]
+        for h in range(n):
+            buckets[h] = []
+            counts[h] = 0
+        label[sink] = 0
+        counts[0] = 1
+        queue = deque([sink])
+        while queue:
+            v = queue.popleft()
+            for e in range(offsets[v], offsets[v + 1]):
+                # The reverse of arc e goes from u to v
+                u = heads[e]
+                if capacities[reverse[e]] and label[u] == n and u != source:
+                    label[u] = label[v] + 1
+                    counts[label[u]] += 1
+                    if excess[u]:
+                        buckets[label[u]].append(u)
+                    queue.append(u)
+        return max((h for h in range(n) if buckets[h]), default=0)
+
+    # Saturate every arc leaving the source. An infinite excess could never be returned to the source, so arcs of infinite capacity only
+    # get more than all finite capacities put together, which is more than any finite cut
+    bound = inf
+    if any(capacities[e] == inf for e in range(offsets[source], offsets[source + 1])):
+        bound = sum(c for c in capacities if c != inf) + 1
+    for e in range(offsets[source], offsets[source + 1]):
+        if capacities[e]:
+            pushed = min(capacities[e], bound)
+            excess[heads[e]] += pushed
+            capacities[reverse[e]] += pushed
+            capacities[e] -= pushed
+    highest = global_relabel()
+    relabels = 0
+
+    while highest >= 0:
+        if not buckets[highest]:
+            highest -= 1
+            continue
+        u = buckets[highest].pop()
+        # Skip vertices lifted out of the way since they were added
+        if label[u] != highest or not excess[u]:
+            continue
+
+        # Discharge u, pushing its excess to neighbours labelled one less until it has none left or needs a relabel
+        start = offsets[u]
+        end = offsets[u + 1]
+        while excess[u]:
+            if pointer[u] == end:
+                # Relabel u to one more than its lowest neighbour with a residual arc
+                relabels += 1
+                old = label[u]
+                counts[old] -= 1
+                new = min((label[heads[e]] for e in range(start, end) if capacities[e]), default=n) + 1
+                if not counts[old]:
+                    # Gap, no vertex labelled above old can reach the sink anymore
+                    for v in range(n):
+                        if old < label[v] < n:
+                            counts[label[v]] -= 1
+                            label[v] = n
+                    new = n
+                label[u] = min(new, n)
+                pointer[u] = start
+                if label[u] >= n:
+                    break
+                counts[label[u]] += 1
+                continue
+            e = pointer[u]
+            v = heads[e]
+            if capacities[e] and label[u] == label[v] + 1:
+                pushed = min(excess[u], capacities[e])
+                capacities[e] -= pushed
+                capacities[reverse[e]] += pushed
+                excess[u] -= pushed
+                if not excess[v] and v != sink and v != source:
+                    buckets[label[v]].append(v)
+                    highest = max(highest, label[v])
+                excess[v] += pushed
+            else:
+                pointer[u] += 1
+
+        if relabels >= n:
+            relabels = 0
+            highest = global_relabel()
+
+    # Return the excess left at vertices that can't reach the sink to the source, so that the flow along every edge is valid.
+    # Every such vertex can reach the source, so the same pushes and relabels are used with labels towards the source
+    label = [2 * n] * n
+    label[source] = 0
+    queue = deque([source])
+    while queue:
+        v = queue.popleft()
+        for e in range(offsets[v], offsets[v + 1]):
+            u = heads[e]
+            if capacities[reverse[e]] and label[u] == 2 * n:
+                label[u] = label[v] + 1
+                queue.append(u)
+    active = deque(u for u in range(n) if excess[u] and u != source and u != sink)
+    pointer = list(offsets)
+    while active:
+        u = active.popleft()
+        start = offsets[u]
+        end = offsets[u + 1]
+        while excess[u]:
+            if pointer[u] == end:
+                label[u] = min(label[heads[e]] for e in range(start, end) if capacities[e]) + 1
+                pointer[u] = start
+                continue
+            e = pointer[u]
+            v = heads[e]
+            if capacities[e] and label[u] == label[v] + 1:
+                pushed = min(excess[u], capacities[e])
+                capacities[e] -= pushed
+                capacities[reverse[e]] += pushed
+                excess[u] -= pushed
+                if not excess[v] and v != source:
+                    active.append(v)
+                excess[v] += pushed
+            else:
+                pointer[u] += 1
+
+    # Only a path of arcs of infinite capacity lets more than all finite capacities through
+    return inf if excess[sink] >= bound else excess[sink]
+
+class CompactFlowNetwork:
+    '''
+    A class representing a Flow Network stored in flat arrays instead of Vertex and Edge objects
+
+    Author: Ooi Yu Zhang
+    '''
+    def __init__(self, edges, maxIn, maxOut, origin, targets) -> None:
+        '''
+        Function description:
+            This function is a constructor for the CompactFlowNetwork class which builds the same flow network as FlowNetwork.
+
+        Approach description:
+            FlowNetwork allocates a Vertex object for every vertex and two Edge objects for every edge, which take hundreds of bytes each.
+            Here, the same vertices and edges are built, with the duplicate of every data centre and the end node, in the same order, but
+            every edge is only written to arrays of integers, which are then turned into the flat arrays of residual_arrays: about 50 bytes
+            per edge. The max flow engines run directly over these arrays.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            edges: a list of tuples representing communication channels (edges)
+            maxIn: list of integers where maxIn[i] specifies the maximum incoming flow that the data centre (vertex) can receive
+            maxOut: list of integers where maxOut[i] specifies the maximum outgoing flow that the data centre (vertex) can send
+            origin: an integer representing the starting vertex
+            targets: a list of integers representing the data centres (vertices) to be reached
+
+        Time complexity: O(|D|+|C|) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
+        Aux space complexity: O(|D|+|C|) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
+        '''
+        # Find total number of vertices in flow network, with the duplicates of the data centres after them and the end node last
+        self.vertices_count = -1
+        for (a, b, c) in edges:
+            self.vertices_count = max(self.vertices_count, max(a, b))
+        duplicate = self.vertices_count + 1
+        self.sink = 2 * duplicate
+        self.origin = origin
+
+        used = [False] * duplicate
+        for (a, b, c) in edges:
+            used[a] = True
+            used[b] = True
+        self.target = target = [False] * duplicate
+        for i in targets:
+            if i < duplicate and used[i]:
+                target[i] = True
+        # Index of the first edge inside of every data centre, or -1 if it isn't used
+        self.centres = array("i", [-1]) * duplicate
+
+        # Edges from connections using duplicated source vertices, then edges inside of the data centres, like FlowNetwork.add_edges
+        tails = array("i")
+        heads = array("i")
+        # Capacity of every edge before any flow
+        capacities = []
+        for (u, v, w) in edges:
+            tails.append(u + duplicate)
+            heads.append(v)
+            capacities.append(min(w, min(maxOut[u], maxIn[v])))
+        for i in range(duplicate):
+            if used[i]:
+                self.centres[i] = len(capacities)
+                if target[i]:
+                    tails.extend((i, i + duplicate))
+                    heads.extend((i + duplicate, self.sink))
+                    capacities.extend((maxIn[i], maxIn[i]))
+                else:
+                    tails.append(i)
+                    heads.append(i + duplicate)
+                    capacities.append(maxOut[i])
+
+        # Capacities that aren't 64-bit integers, such as floats or infinity, are kept in lists instead
+        self.capacities = array("q", capacities) if is_int64(capacities) else capacities
+        self.offsets, self.heads, self.residual, self.reverse, self.arcs = residual_arrays(self.sink + 1, tails, heads, self.capacities,
+                                                                                           array("q", bytes(8 * len(capacities))))
+
+    def __len__(self) -> int:
+        '''
+        Returns the number of edges in the flow network
+        '''
+        return len(self.arcs)
+
+    def nbytes(self) -> int:
+        '''
+        Returns the number of bytes taken by the arrays of the flow network, counting the list and its numbers for capacities kept in a list
+        '''
+        total = 0
+        for a in (self.capacities, self.offsets, self.heads, self.residual, self.reverse, self.arcs, self.centres):
+            if isinstance(a, array):
+                total += len(a) * a.itemsize
+            else:
+                total += sys.getsizeof(a) + sum(sys.getsizeof(c) for c in a)
+        return total
+
+    def ford_fulkerson(self) -> int:
+        '''
+        Returns the maximum flow from the origin to the targets with ford_fulkerson_arrays, leaving the flow in the residual capacities
+        '''
+        return ford_fulkerson_arrays(self.offsets, self.heads, self.residual, self.reverse, self.origin, self.sink)
+
+    def dinic(self) -> int:
+        '''
+        Returns the maximum flow from the origin to the targets with dinic_arrays, leaving the flow in the residual capacities
+        '''
+        return dinic_arrays(self.offsets, self.heads, self.residual, self.reverse, self.origin, self.sink)
+
+    def push_relabel(self) -> int:
+        '''
+        Returns the maximum flow from the origin to the targets with push_relabel_arrays, leaving the flow in the residual capacities
+        '''
+        return push_relabel_arrays(self.offsets, self.heads, self.residual, self.reverse, self.origin, self.sink)
+
+    def tail(self, k) -> int:
+        '''
+        Returns the vertex that edge k leaves
+        '''
+        return self.heads[self.reverse[self.arcs[k]]]
+
+    def flows(self) -> list:
+        '''
+        Returns the flow along every edge, in the same order as FlowNetwork.edges
+        '''
+        return [self.capacities[k] - self.residual[self.arcs[k]] for k in range(len(self.arcs))]
+
+    def min_cut(self) -> list:
+        '''
+        Returns the indices of the edges from the vertices that can still be reached from the origin in the residual network to the ones
+        that can't, like FlowNetwork.min_cut
+        '''
+        reached = [False] * (self.sink + 1)
+        reached[self.origin] = True
+        queue = deque([self.origin])
+        while queue:
+            u = queue.popleft()
+            for e in range(self.offsets[u], self.offsets[u + 1]):
+                if self.residual[e] and not reached[self.heads[e]]:
+                    reached[self.heads[e]] = True
+                    queue.append(self.heads[e])
+        return [k for k in range(len(self.arcs)) if reached[self.tail(k)] and not reached[self.heads[self.arcs[k]]]]
+
+class MaxThroughputSolver:
+    '''
+    A class representing the maximum throughput of a CompactFlowNetwork, which is kept up to date while the capacities of the channels
+    and the limits of the data centres change
+
+    Author: Ooi Yu Zhang
+    '''
+    def __init__(self, connections, maxIn, maxOut, origin, targets, engine="dinic") -> None:
+        '''
+        Function description:
+            This function is a constructor for the MaxThroughputSolver class, which builds a CompactFlowNetwork and finds its maximum flow
+            once, so that set_capacity and set_node_limits can start from that flow instead of zero.
+
+        Approach description:
+            The flow is kept in the residual capacities of the CompactFlowNetwork between changes. The channels between every pair of data
+            centres, the channels leaving and entering every data centre and the edges into the end node are indexed here, so that a change
+            only touches the edges it affects.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            connections: a list of tuples representing communication channels (edges)
+            maxIn: list of integers where maxIn[i] specifies the maximum incoming flow that the data centre (vertex) can receive
+            maxOut: list of integers where maxOut[i] specifies the maximum outgoing flow that the data centre (vertex) can send
+            origin: an integer representing the starting vertex
+            targets: a list of integers representing the data centres (vertices) to be reached
+            engine: a string selecting the max flow algorithm used to augment the flow, either "ford_fulkerson", "dinic" or "push_relabel"
+
+        Time complexity: the time complexity of the engine, see maxThroughput
+        Aux space complexity: O(|D|+|C|) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
+        '''
+        engines = {"ford_fulkerson": ford_fulkerson_arrays, "dinic": dinic_arrays, "push_relabel": push_relabel_arrays}
+        if engine not in engines:
+            raise ValueError("Unknown engine: " + str(engine))
+        self.engine = engines[engine]
+        self.connections = list(connections)
+        self.maxIn = list(maxIn)
+        self.maxOut = list(maxOut)
+        self.network = network = CompactFlowNetwork(self.connections, self.maxIn, self.maxOut, origin, targets)
+
+        # Indices of the channels between every pair of data centres, and of the channels leaving and entering every data centre
+        self.channels = {}
+        self.leaving = [[] for _ in range(network.vertices_count + 1)]
+        self.entering = [[] for _ in range(network.vertices_count + 1)]
+        for k, (u, v, w) in enumerate(self.connections):
+            self.channels.setdefault((u, v), []).append(k)
+            self.leaving[u].append(k)
+            self.entering[v].append(k)
+        # Edges into the end node, whose flows add up to the throughput
+        self.ends = [k for k in range(len(network)) if network.heads[network.arcs[k]] == network.sink]
+        self.flow = 0
+        self.update()
+
+    def set_capacity(self, u, v, c) -> int:
+        '''
+        Function description:
+            This function sets the capacity of the channels from data centre u to data centre v to c, and returns the new maximum throughput.
+
+        Approach description:
+            The capacity of the edge of every such channel is changed with set_edge, which keeps the flow valid, then update augments the
+            flow from where it was instead of running the engine from zero flow.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            u: an integer representing the data centre the channels leave
+            v: an integer representing the data centre the channels enter
+            c: an integer representing the new capacity of the channels
+        Output:
+            an integer representing the new maximum possible data throughput
+
+        Time complexity: O(|D|+|C|) per unit of flow that has to be moved, plus the engine from the previous flow
+        Aux space complexity: O(|D|+|C|) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
+        '''
+        if (u, v) not in self.channels:
+            raise ValueError("No channel from " + str(u) + " to " + str(v))
+        for k in self.channels[(u, v)]:
+            self.connections[k] = (u, v, c)
+            self.set_edge(k, min(c, min(self.maxOut[u], self.maxIn[v])))
+        return self.update()
+
+    def set_node_limits(self, i, maxIn, maxOut) -> int:
+        '''
+        Function description:
+            This function sets the maximum incoming and outgoing flow of data centre i, and returns the new maximum throughput.
+
+        Approach description:
+            The limits of a data centre bound the capacity of the channels leaving and entering it and of the edges inside of it, see
+            CompactFlowNetwork, so only those edges are changed with set_edge before update augments the flow.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            i: an integer representing the data centre
+            maxIn: an integer representing the maximum incoming flow that the data centre can receive
+            maxOut: an integer representing the maximum outgoing flow that the data centre can send
+        Output:
+            an integer representing the new maximum possible data throughput
+
+        Time complexity: O(|D|+|C|) per unit of flow that has to be moved, plus the engine from the previous flow
+        Aux space complexity: O(|D|+|C|) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
+        '''
+        self.maxIn[i] = maxIn
+        self.maxOut[i] = maxOut
+        # A data centre without channels has no edges
+        if i >= len(self.leaving):
+            return self.flow
+        for k in self.leaving[i] + self.entering[i]:
+            (u, v, w) = self.connections[k]
+            self.set_edge(k, min(w, min(self.maxOut[u], self.maxIn[v])))
+        k = self.network.centres[i]
+        if k >= 0:
+            if self.network.target[i]:
+                self.set_edge(k, maxIn)
+                self.set_edge(k + 1, maxIn)
+            else:
+                self.set_edge(k, maxOut)
+        return self.update()
+
+    def set_edge(self, k, capacity) -> None:
+        '''
+        Function description:
+            This function sets the capacity of edge k of the flow network, and moves the flow that no longer fits along it elsewhere.
+
+        Approach description:
+            If the flow along the edge still fits, only its residual capacity changes. Otherwise, the edge keeps as much flow as it can,
+            which leaves the rest stuck at the vertex the edge leaves and missing at the vertex it enters. The rest is first sent from the
+            one to the other around the edge through the residual network, which keeps the throughput. What can't go around must have come
+            from the origin and have been going to the end node, so it is sent back to the origin, and the same amount is sent from the end
+            node to the vertex the edge enters, which lowers the throughput until update augments it again.
+
+        Author: Ooi Yu Zhang
+
+        Input:
+            k: an integer representing the index of the edge, like CompactFlowNetwork.flows
+            capacity: an integer representing the new capacity of the edge
+
+        Time complexity: O(|D|+|C|) per unit of flow that has to be moved
+        Aux space complexity: O(|D|+|C|) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
+        '''
+        network = self.network
+        # Capacities that aren't 64-bit integers can only be kept in lists, see CompactFlowNetwork
+        if isinstance(network.capacities, array) and not is_int64((capacity,)):
+            network.capacities = list(network.capacities)
+            network.residual = list(network.residual)
+        arc = network.arcs[k]
+        flow = network.capacities[k] - network.residual[arc]
+        network.capacities[k] = capacity
+        if flow <= capacity:
+            network.residual[arc] = capacity - flow
+            return
+
+        network.residual[arc] = 0
+        network.residual[network.reverse[arc]] = capacity
+        excess = flow - capacity
+        a = network.tail(k)
+        b = network.heads[arc]
+        excess -= ford_fulkerson_arrays(network.offsets, network.heads, network.residual, network.reverse, a, b, excess)
+        if excess:
+            if a != network.origin:
+                ford_fulkerson_arrays(network.offsets, network.heads, network.residual, network.reverse, a, network.origin, excess)
+            if b != network.origin and b != network.sink:
+                ford_fulkerson_arrays(network.offsets, network.heads, network.residual, network.reverse, network.sink, b, excess)
+
+    def update(self) -> int:
+        '''
+        Augments the flow with the engine from where it is, and returns the new maximum throughput
+        '''
+        network = self.network
+        self.engine(network.offsets, network.heads, network.residual, network.reverse, network.origin, network.sink)
+        self.flow = sum(network.capacities[k] - network.residual[network.arcs[k]] for k in self.ends)
+        return self.flow
+
+    def result(self, flows=False):
+        '''
+        Returns the maximum throughput, or [maxFlow, channel_flows, cut_channels, cut_centres] if flows is True, like maxThroughput
+        '''
+        if not flows:
+            return self.flow
+        return [self.flow] + flow_report(self.network, len(self.connections))
+
+def maxThroughput(connections, maxIn, maxOut, origin, targets, engine="ford_fulkerson", flows=False, compact=False):
     '''
     Function description:
-        This function utilises the Ford-Fulkerson algorithm to compute the maximum possible flow from an origin to a list of specified targets.
+        This function utilises the Ford-Fulkerson algorithm, or Dinic's or the push-relabel algorithm if selected with engine, to compute the
+        maximum possible flow from an origin to a list of specified targets.
 
     Approach description:
         The main approach/concept in implementing this function was the use of duplicate vertices for each vertex to emulate the limits of
@@ -256,6 +1016,10 @@ def maxThroughput(connections, maxIn, maxOut, origin, targets) -> int:
         the origin to the end node. Meanwhile, as long as the BFS is still running, the function will find the minimum throughput for every path
         and update the residual network accordingly, until there are no paths anymore, after which we will have a min cut in our flow network,
         giving us our maximum throughput.
+        The "dinic" engine instead sends a blocking flow along the shortest paths of every phase (see FlowNetwork.dinic), and the
+        "push_relabel" engine pushes excesses of flow towards the end node from the vertex with the highest label (see
+        FlowNetwork.push_relabel), which both find the same maximum throughput on the same flow network. If compact is True, the flow
+        network is stored in flat arrays by a CompactFlowNetwork instead of Vertex and Edge objects, and the engines run over the arrays.
 
     Author: Ooi Yu Zhang
 
@@ -265,12 +1029,127 @@ def maxThroughput(connections, maxIn, maxOut, origin, targets) -> int:
         maxOut: list of integers where maxOut[i] specifies the maximum outgoing flow that the data centre (vertex) can send
         origin: an integer representing the starting vertex
         targets: a list of integers representing the data centres (vertices) to be reached
+        engine: a string selecting the max flow algorithm, either "ford_fulkerson" below, "dinic" for FlowNetwork.dinic or "push_relabel"
+                for FlowNetwork.push_relabel
+        flows: a boolean indicating whether the flow along every channel and a minimum cut are needed
+        compact: a boolean indicating whether to build a CompactFlowNetwork, which takes an order of magnitude less memory, instead of a
+                 FlowNetwork. The memory is only saved when every capacity and limit fits in a 64-bit integer, otherwise (such as for
+                 floats or infinity) the capacities are kept in lists
     Output:
         maxFlow: an integer representing the maximum possible data throughput from the data centre origin to the data centres specified in targets
+        If flows is True, a list of [maxFlow, channel_flows, cut_channels, cut_centres] instead, where channel_flows is the data sent along
+        every channel in connections, cut_channels is the indices in connections of the channels and cut_centres is the data centres whose
+        limits form a minimum cut. All of them are saturated, and increasing any other limit can't increase the throughput
 
-    Time complexity: O(|D|*|C|^2) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
+    Time complexity:
+        O(|D|*|C|^2) with "ford_fulkerson", O(|D|^2*|C|) with "dinic" and O(|D|^2*sqrt(|C|)) with "push_relabel", where D is the number of
+        vertices (data centres) and C is the number of edges (communication channels)
     Aux space complexity: O(|D|+|C|) where D is the number of vertices (data centres) and C is the number of edges (communication channels)
     '''
-    flownetwork = FlowNetwork(connections, maxIn, maxOut, origin, targets)
-    maxFlow = flownetwork.ford_fulkerson()
-    return maxFlow
+    if compact:
+        flownetwork = CompactFlowNetwork(connections, maxIn, maxOut, origin, targets)
+    else:
+        flownetwork = FlowNetwork(connections, maxIn, maxOut, origin, targets)
+    # Use another engine if requested
+    if engine == "dinic":
+        maxFlow = flownetwork.dinic()
+    elif engine == "push_relabel":
+        maxFlow = flownetwork.push_relabel()
+    elif engine == "ford_fulkerson":
+        maxFlow = flownetwork.ford_fulkerson()
+    else:
+        raise ValueError("Unknown engine: " + str(engine))
+    if not flows:
+        return maxFlow
+    return [maxFlow] + flow_report(flownetwork, len(connections))
+
+def flow_report(flownetwork, channels_count) -> list:
+    '''
+    Returns [channel_flows, cut_channels, cut_centres] of a FlowNetwork or CompactFlowNetwork after its maximum flow was found, where
+    channel_flows is the data sent along every channel, cut_channels is the indices of the channels and cut_centres is the data centres
+    whose limits form a minimum cut, see maxThroughput
+    '''
+    # The channels are the first edges of the flow network, followed by the edges inside of the data centres
+    channel_flows = flownetwork.flows()[:channels_count]
+    cut_channels = []
+    cut_centres = []
+    for k in flownetwork.min_cut():
+        if k < channels_count:
+            cut_channels.append(k)
+        else:
+            # The edge inside of a data centre either leaves it or its duplicate
+            centre = flownetwork.tail(k) % (flownetwork.vertices_count + 1)
+            if centre not in cut_centres:
+                cut_centres.append(centre)
+    return [channel_flows, cut_channels, cut_centres]
+
+##############################
+########### Tests ############
+##############################
+def test_maxthroughput_engines():
+    connections = [(0, 1, 3000), (1, 2, 2000), (1, 3, 1000), (0, 3, 2000), (3, 4, 2000), (3, 2, 1000)]
+    maxIn = [5000, 3000, 3000, 3000, 2000]
+    maxOut = [5000, 3000, 3000, 2500, 1500]
+    origin = 0
+    targets = [4, 2]
+    res = [maxThroughput(connections, maxIn, maxOut, origin, targets, engine) for engine in ["ford_fulkerson", "dinic", "push_relabel"]]
+    return res == [4500, 4500, 4500]
+
+def test_maxthroughput_flows():
+    connections = [(0, 1, 3000), (1, 2, 2000), (1, 3, 1000), (0, 3, 2000), (3, 4, 2000), (3, 2, 1000)]
+    maxIn = [5000, 3000, 3000, 3000, 2000]
+    maxOut = [5000, 3000, 3000, 2500, 1500]
+    origin = 0
+    targets = [4, 2]
+    maxFlow, channel_flows, cut_channels, cut_centres = maxThroughput(connections, maxIn, maxOut, origin, targets, flows=True)
+    # The channel from 1 to 2 and the outgoing limit of 3 are saturated
+    res_1 = maxFlow == 4500 and cut_channels == [1] and cut_centres == [3]
+    res_2 = channel_flows[1] == 2000 and channel_flows[4] + channel_flows[5] == 2500
+    return res_1 and res_2
+
+def test_compactflownetwork():
+    connections = [(0, 1, 3000), (1, 2, 2000), (1, 3, 1000), (0, 3, 2000), (3, 4, 2000), (3, 2, 1000)]
+    maxIn = [5000, 3000, 3000, 3000, 2000]
+    maxOut = [5000, 3000, 3000, 2500, 1500]
+    origin = 0
+    targets = [4, 2]
+    expected = maxThroughput(connections, maxIn, maxOut, origin, targets, flows=True)
+    res = [maxThroughput(connections, maxIn, maxOut, origin, targets, engine, flows=True, compact=True)
+           for engine in ["ford_fulkerson", "dinic", "push_relabel"]]
+    # The same edges are built in the same order, 6 channels and 2 edges for each of the 2 targets and 1 for each other data centre
+    res_1 = all(r[0] == 4500 and r[2:] == expected[2:] for r in res) and len(CompactFlowNetwork(connections, maxIn, maxOut, origin, targets)) == 13
+    # Capacities that don't fit in 64-bit integers are kept in lists instead
+    res_2 = all(maxThroughput([(0, 1, 2.5), (1, 2, 3)], [inf] * 3, [inf] * 3, 0, [2], engine, compact=True) == 2.5 and
+                maxThroughput([(0, 1, 2 ** 70), (1, 2, 2 ** 70)], [2 ** 71] * 3, [2 ** 71] * 3, 0, [2], engine, compact=True) == 2 ** 70
+                for engine in ["ford_fulkerson", "dinic", "push_relabel"])
+    # An origin with the index of the end node must not be mistaken for it
+    args = ([(2, 1, 9)], [1, 2, 7, 9, 2, 7, 2], [2, 5, 10, 4, 2, 7, 12], 6, [1, 2])
+    res_3 = all(maxThroughput(*args, engine, compact=compact) == 0 for engine in ["ford_fulkerson", "dinic", "push_relabel"]
+                for compact in [False, True])
+    return res_1 and res_2 and res_3
+
+def test_maxthroughputsolver():
+    connections = [(0, 1, 3000), (1, 2, 2000), (1, 3, 1000), (0, 3, 2000), (3, 4, 2000), (3, 2, 1000)]
+    maxIn = [5000, 3000, 3000, 3000, 2000]
+    maxOut = [5000, 3000, 3000, 2500, 1500]
+    origin = 0
+    targets = [4, 2]
+    solver = MaxThroughputSolver(connections, maxIn, maxOut, origin, targets)
+    res_1 = solver.result() == 4500
+    # Lowering the saturated channel from 1 to 2 loses flow, as 3 already sends all it can
+    res_2 = solver.set_capacity(1, 2, 500) == 3000
+    # Raising the outgoing limit of 3 lets it send all it receives
+    res_3 = solver.set_node_limits(3, 3000, 3000) == 3500
+    connections[1] = (1, 2, 500)
+    maxOut[3] = 3000
+    res_4 = solver.result(flows=True) == maxThroughput(connections, maxIn, maxOut, origin, targets, flows=True)
+    return res_1 and res_2 and res_3 and res_4
+
+#######################################################################
+
+#print(test_maxthroughput_engines())
+#print(test_maxthroughput_flows())
+#print(test_compactflownetwork())
+#print(test_maxthroughputsolver())
+
+#######################################################################